@@ -0,0 +1,78 @@
+"""Add technicians, availability and bookings tables
+
+Revision ID: 4f8c0b6de913
+Revises: e2a9d5c13b47
+Create Date: 2026-10-19 13:40:05.217793
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f8c0b6de913'
+down_revision: Union[str, Sequence[str], None] = 'e2a9d5c13b47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('technicians',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('active', sa.Boolean(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_technicians_id'), 'technicians', ['id'], unique=False)
+
+    op.create_table('technician_availability',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('technicianId', sa.Integer(), nullable=False),
+    sa.Column('weekday', sa.Integer(), nullable=False),
+    sa.Column('startTime', sa.Time(), nullable=False),
+    sa.Column('endTime', sa.Time(), nullable=False),
+    sa.ForeignKeyConstraint(['technicianId'], ['technicians.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_technician_availability_id'), 'technician_availability', ['id'], unique=False)
+    op.create_index(op.f('ix_technician_availability_technicianId'), 'technician_availability', ['technicianId'], unique=False)
+
+    op.create_table('bookings',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('leadId', sa.Integer(), nullable=False),
+    sa.Column('technicianId', sa.Integer(), nullable=False),
+    sa.Column('startsAt', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('endsAt', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('createdAt', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['technicianId'], ['technicians.id']),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_bookings_id'), 'bookings', ['id'], unique=False)
+    op.create_index(op.f('ix_bookings_leadId'), 'bookings', ['leadId'], unique=False)
+    op.create_index('ix_bookings_technicianId_startsAt', 'bookings', ['technicianId', 'startsAt'], unique=False)
+
+    # Double-booking guard enforced by Postgres itself, so concurrent requests cannot race past it
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    op.execute(
+        'ALTER TABLE bookings ADD CONSTRAINT bookings_no_overlap '
+        'EXCLUDE USING gist ("technicianId" WITH =, tstzrange("startsAt", "endsAt") WITH &&) '
+        "WHERE (status = 'BOOKED')"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('ALTER TABLE bookings DROP CONSTRAINT bookings_no_overlap')
+    op.drop_index('ix_bookings_technicianId_startsAt', table_name='bookings')
+    op.drop_index(op.f('ix_bookings_leadId'), table_name='bookings')
+    op.drop_index(op.f('ix_bookings_id'), table_name='bookings')
+    op.drop_table('bookings')
+    op.drop_index(op.f('ix_technician_availability_technicianId'), table_name='technician_availability')
+    op.drop_index(op.f('ix_technician_availability_id'), table_name='technician_availability')
+    op.drop_table('technician_availability')
+    op.drop_index(op.f('ix_technicians_id'), table_name='technicians')
+    op.drop_table('technicians')
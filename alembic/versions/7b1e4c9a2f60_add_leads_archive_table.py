@@ -0,0 +1,58 @@
+"""Add leads_archive table for cold leads
+
+Revision ID: 7b1e4c9a2f60
+Revises: 3d45252e6987
+Create Date: 2026-10-19 09:12:41.503218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b1e4c9a2f60'
+down_revision: Union[str, Sequence[str], None] = '3d45252e6987'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('leads_archive',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('firstName', sa.String(), nullable=True),
+    sa.Column('lastName', sa.String(), nullable=True),
+    sa.Column('phone', sa.String(), nullable=True),
+    sa.Column('email', sa.String(), nullable=True),
+    sa.Column('make', sa.String(), nullable=True),
+    sa.Column('model', sa.String(), nullable=True),
+    sa.Column('year', sa.String(), nullable=True),
+    sa.Column('bodyType', sa.String(), nullable=True),
+    sa.Column('urgency', sa.String(), nullable=True),
+    sa.Column('damageDescription', sa.Text(), nullable=True),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('createdAt', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('messages', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('vin', sa.String(), nullable=True),
+    sa.Column('glassToReplace', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('addonServices', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('preferredDate', sa.String(), nullable=True),
+    sa.Column('preferredTime', sa.String(), nullable=True),
+    sa.Column('preferredDaysTimes', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('archivedAt', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_leads_archive_phone'), 'leads_archive', ['phone'], unique=False)
+    op.create_index(op.f('ix_leads_archive_createdAt'), 'leads_archive', ['createdAt'], unique=False)
+    op.create_index('ix_leads_status_createdAt', 'leads', ['status', 'createdAt'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_leads_status_createdAt', table_name='leads')
+    op.drop_index(op.f('ix_leads_archive_createdAt'), table_name='leads_archive')
+    op.drop_index(op.f('ix_leads_archive_phone'), table_name='leads_archive')
+    op.drop_table('leads_archive')
@@ -0,0 +1,43 @@
+"""Add trigram indexes and possibleDuplicates for lead intake
+
+Revision ID: 9c3f6a1e8d25
+Revises: 4f8c0b6de913
+Create Date: 2026-10-19 15:21:48.310562
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c3f6a1e8d25'
+down_revision: Union[str, Sequence[str], None] = '4f8c0b6de913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('leads', sa.Column('possibleDuplicates', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    op.add_column('leads_archive', sa.Column('possibleDuplicates', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+    # Expressions must match app/lead_intake.py exactly for the planner to use these indexes
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.execute(
+        'CREATE INDEX ix_leads_full_name_trgm ON leads '
+        'USING gin (lower(("firstName" || \' \') || "lastName") gin_trgm_ops)'
+    )
+    op.execute('CREATE INDEX ix_leads_email_trgm ON leads USING gin (lower(email) gin_trgm_ops)')
+    op.execute('CREATE INDEX ix_leads_vin_trgm ON leads USING gin (vin gin_trgm_ops)')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_leads_vin_trgm', table_name='leads')
+    op.drop_index('ix_leads_email_trgm', table_name='leads')
+    op.drop_index('ix_leads_full_name_trgm', table_name='leads')
+    op.drop_column('leads_archive', 'possibleDuplicates')
+    op.drop_column('leads', 'possibleDuplicates')
@@ -0,0 +1,60 @@
+"""Add price_catalog table
+
+Revision ID: e2a9d5c13b47
+Revises: 7b1e4c9a2f60
+Create Date: 2026-10-19 11:02:17.884120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a9d5c13b47'
+down_revision: Union[str, Sequence[str], None] = '7b1e4c9a2f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('price_catalog',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('category', sa.String(), nullable=False),
+    sa.Column('item', sa.String(), nullable=False),
+    sa.Column('glassType', sa.String(), nullable=True),
+    sa.Column('make', sa.String(), nullable=True),
+    sa.Column('model', sa.String(), nullable=True),
+    sa.Column('yearMin', sa.Integer(), nullable=True),
+    sa.Column('yearMax', sa.Integer(), nullable=True),
+    sa.Column('bodyType', sa.String(), nullable=True),
+    sa.Column('price', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('updatedAt', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_price_catalog_id'), 'price_catalog', ['id'], unique=False)
+    # app/pricing.py fingerprints the catalog on count/max("updatedAt"), so it must move on
+    # every edit, including ones made with plain SQL rather than through the ORM
+    op.execute("""
+        CREATE FUNCTION price_catalog_touch_updated_at() RETURNS trigger AS $$
+        BEGIN
+            NEW."updatedAt" := clock_timestamp();
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER price_catalog_touch_updated_at
+        BEFORE UPDATE ON price_catalog
+        FOR EACH ROW EXECUTE FUNCTION price_catalog_touch_updated_at()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS price_catalog_touch_updated_at ON price_catalog")
+    op.execute("DROP FUNCTION IF EXISTS price_catalog_touch_updated_at()")
+    op.drop_index(op.f('ix_price_catalog_id'), table_name='price_catalog')
+    op.drop_table('price_catalog')
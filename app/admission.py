@@ -0,0 +1,180 @@
+# app/admission.py
+#
+# Admission control for the public lead intake. POST /api/leads is reachable by anyone
+# and costs an insert plus an SMS, so a bot burst could otherwise exhaust the DB pool
+# and stall the owner's dashboard. Per worker process:
+#   - per-IP (here) and per-phone (in create_new_lead) token buckets answer 429,
+#   - a shared concurrency budget where intake may only use CAPACITY - OWNER_RESERVED
+#     slots and is shed immediately with 503, while owner routes (everything else,
+#     including the Twilio webhook) can use every slot and queue briefly for one.
+
+import asyncio
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Tuple
+
+from starlette.responses import JSONResponse
+
+MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", "15")) # SQLAlchemy's default pool_size + max_overflow
+OWNER_RESERVED_SLOTS = int(os.getenv("OWNER_RESERVED_SLOTS", "5"))
+OWNER_QUEUE_TIMEOUT = float(os.getenv("OWNER_QUEUE_TIMEOUT", "2.0"))
+
+INTAKE_IP_RATE_PER_MINUTE = float(os.getenv("INTAKE_IP_RATE_PER_MINUTE", "6"))
+INTAKE_IP_BURST = int(os.getenv("INTAKE_IP_BURST", "10"))
+INTAKE_PHONE_RATE_PER_HOUR = float(os.getenv("INTAKE_PHONE_RATE_PER_HOUR", "4"))
+INTAKE_PHONE_BURST = int(os.getenv("INTAKE_PHONE_BURST", "3"))
+# Proxies in front of the app that append to X-Forwarded-For. With 0 the socket peer is used
+# and the header ignored, since a direct client could send a fresh value each request and
+# dodge the per-IP limit. Behind a proxy (Render, Vercel, nginx) set this to the number of
+# proxy hops - usually 1 - or every client shares the proxy's address and bucket.
+TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", "0"))
+
+MAX_TRACKED_KEYS = 10000
+
+counters = Counter()
+
+
+class TokenBucketLimiter:
+    """One token bucket per key, refilled continuously; least recently seen keys are evicted."""
+
+    def __init__(self, rate_per_second: float, burst: int, max_keys: int = MAX_TRACKED_KEYS):
+        self.rate = rate_per_second
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def allow(self, key: str) -> Tuple[bool, float]:
+        """Takes a token for key. Returns (allowed, seconds until the next token)."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (float(self.burst), now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, 0.0 if allowed else (1 - tokens) / self.rate
+
+
+ip_limiter = TokenBucketLimiter(INTAKE_IP_RATE_PER_MINUTE / 60, INTAKE_IP_BURST)
+phone_limiter = TokenBucketLimiter(INTAKE_PHONE_RATE_PER_HOUR / 3600, INTAKE_PHONE_BURST)
+
+
+def is_intake_request(scope) -> bool:
+    return scope["method"] == "POST" and scope["path"].rstrip("/") == "/api/leads"
+
+
+def client_ip(scope) -> str:
+    if TRUSTED_PROXY_HOPS > 0:
+        for name, value in scope.get("headers", ()):
+            if name == b"x-forwarded-for":
+                hops = [h.strip() for h in value.decode("latin-1").split(",") if h.strip()]
+                # Entries left of what our own proxies appended are client-controlled
+                if hops:
+                    return hops[-min(TRUSTED_PROXY_HOPS, len(hops))]
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def check_phone_rate(phone: str) -> Tuple[bool, float]:
+    allowed, retry_after = phone_limiter.allow(phone)
+    if not allowed:
+        counters["rate_limited_phone"] += 1
+    return allowed, retry_after
+
+
+def _reject(status_code: int, detail: str, retry_after: float) -> JSONResponse:
+    return JSONResponse(
+        {"detail": detail},
+        status_code=status_code,
+        headers={"Retry-After": str(max(1, int(retry_after + 0.999)))},
+    )
+
+
+class AdmissionControlMiddleware:
+    def __init__(self, app, capacity: int = MAX_CONCURRENT_REQUESTS, owner_reserved: int = OWNER_RESERVED_SLOTS):
+        self.app = app
+        self.capacity = capacity
+        self.intake_limit = max(capacity - owner_reserved, 1)
+        self.in_flight = 0
+        self.in_flight_intake = 0
+        self._slot_freed = None # asyncio.Condition, created inside the running loop
+
+    async def _acquire(self, limit: int, timeout: float) -> bool:
+        # Runs on the event loop thread only, so the counters need no lock
+        if self.in_flight < limit:
+            self.in_flight += 1
+            return True
+        if timeout <= 0:
+            return False
+        if self._slot_freed is None:
+            self._slot_freed = asyncio.Condition()
+        async with self._slot_freed:
+            try:
+                await asyncio.wait_for(self._slot_freed.wait_for(lambda: self.in_flight < limit), timeout)
+            except asyncio.TimeoutError:
+                return False
+            self.in_flight += 1
+            return True
+
+    async def _release(self):
+        self.in_flight -= 1
+        if self._slot_freed is not None:
+            async with self._slot_freed:
+                self._slot_freed.notify()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        intake = is_intake_request(scope)
+        if intake:
+            allowed, retry_after = ip_limiter.allow(client_ip(scope))
+            if not allowed:
+                counters["rate_limited_ip"] += 1
+                await _reject(429, "Too many requests. Please try again shortly.", retry_after)(scope, receive, send)
+                return
+
+        admitted = await self._acquire(self.intake_limit, 0) if intake else await self._acquire(self.capacity, OWNER_QUEUE_TIMEOUT)
+        if not admitted:
+            counters["shed_intake" if intake else "shed_owner"] += 1
+            await _reject(503, "Server is busy. Please try again shortly.", 1)(scope, receive, send)
+            return
+
+        counters["admitted_intake" if intake else "admitted_owner"] += 1
+        if intake:
+            self.in_flight_intake += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            if intake:
+                self.in_flight_intake -= 1
+            await self._release()
+
+
+_middleware = None
+
+
+def admission_stats() -> dict:
+    stats = dict(counters)
+    if _middleware is not None:
+        stats.update(
+            in_flight=_middleware.in_flight,
+            in_flight_intake=_middleware.in_flight_intake,
+            capacity=_middleware.capacity,
+            intake_limit=_middleware.intake_limit,
+        )
+    return stats
+
+
+def admission_control(app):
+    """Factory for app.add_middleware that keeps a handle on the instance for admission_stats()."""
+    global _middleware
+    _middleware = AdmissionControlMiddleware(app)
+    return _middleware
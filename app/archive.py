@@ -0,0 +1,148 @@
+# app/archive.py
+#
+# Hot/cold split for the leads table. Leads in a terminal status that are older
+# than LEAD_ARCHIVE_AFTER_DAYS are moved into leads_archive so the indexes used by
+# every dashboard/webhook query only cover the working set.
+#
+# Run on a schedule with:  python -m app.archive
+
+import os
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from sqlalchemy import func, insert, literal, select
+from sqlalchemy.orm import Session
+
+from app.models import Lead as DBLead, LeadArchive
+
+ARCHIVE_AFTER_DAYS = int(os.getenv("LEAD_ARCHIVE_AFTER_DAYS", "365"))
+ARCHIVE_STATUSES = [
+    s.strip() for s in os.getenv("LEAD_ARCHIVE_STATUSES", "COMPLETED,CANCELLED").split(",") if s.strip()
+]
+ARCHIVE_BATCH_SIZE = int(os.getenv("LEAD_ARCHIVE_BATCH_SIZE", "500"))
+# A lead that comes back from the archive (customer replied, owner wrote) needs attention again
+RESTORED_STATUS = "NEW"
+
+# Both tables share these column names, so rows can be copied with INSERT ... SELECT
+LEAD_COLUMNS = [c.name for c in DBLead.__table__.columns]
+
+
+def archive_stale_leads(
+    db: Session,
+    older_than_days: Optional[int] = None,
+    statuses: Optional[List[str]] = None,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+) -> int:
+    """Moves terminal leads older than the cutoff into leads_archive. Returns the number moved."""
+    days = ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    statuses = statuses or ARCHIVE_STATUSES
+    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+
+    leads_table = DBLead.__table__
+    archived = 0
+    while True:
+        # Small batches keep row locks and WAL bursts short on the live table
+        ids = db.execute(
+            select(DBLead.id)
+            .where(DBLead.status.in_(statuses), DBLead.createdAt < cutoff)
+            .order_by(DBLead.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+        if not ids:
+            break
+
+        db.execute(
+            insert(LeadArchive.__table__).from_select(
+                LEAD_COLUMNS + ["archivedAt"],
+                select(*[leads_table.c[name] for name in LEAD_COLUMNS], func.now()).where(leads_table.c.id.in_(ids)),
+            )
+        )
+        db.query(DBLead).filter(DBLead.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+
+        archived += len(ids)
+        print(f"DEBUG: archive_stale_leads - Archived batch of {len(ids)} leads (total {archived}).")
+
+    return archived
+
+
+def get_archived_lead(db: Session, lead_id: int) -> Optional[LeadArchive]:
+    return db.query(LeadArchive).filter(LeadArchive.id == lead_id).first()
+
+
+def find_archived_lead_by_phone(db: Session, phone_suffix: str) -> Optional[LeadArchive]:
+    """Returns the newest archived lead for the number, row-locked until commit.
+
+    A concurrent restore of the same lead makes this wait and then return None once it
+    commits; lock_or_restore_lead_by_phone then finds it in the hot table.
+    """
+    # Newest first: the same number may have been archived more than once
+    return (
+        db.query(LeadArchive)
+        .filter(LeadArchive.phone.ilike(f"%{phone_suffix}"))
+        .order_by(LeadArchive.createdAt.desc())
+        .with_for_update()
+        .first()
+    )
+
+
+def restore_archived_lead(db: Session, archived_lead: LeadArchive) -> DBLead:
+    """Moves an archived lead back into the hot table, keeping its id, and returns it.
+
+    The lead is reopened as RESTORED_STATUS so the next archival run doesn't move it
+    straight back. Not committed here: the caller commits along with its own change to
+    the lead, so the restored row stays locked until then.
+    """
+    lead_id = archived_lead.id
+    archive_table = LeadArchive.__table__
+    columns = [
+        literal(RESTORED_STATUS).label("status") if name == "status" else archive_table.c[name]
+        for name in LEAD_COLUMNS
+    ]
+    db.execute(
+        insert(DBLead.__table__).from_select(
+            LEAD_COLUMNS,
+            select(*columns).where(archive_table.c.id == lead_id),
+        )
+    )
+    db.delete(archived_lead)
+    db.flush()
+    print(f"DEBUG: restore_archived_lead - Lead {lead_id} moved back from archive.")
+    return db.query(DBLead).filter(DBLead.id == lead_id).first()
+
+
+def lock_or_restore_lead(db: Session, lead_id: int) -> Optional[DBLead]:
+    """Returns the lead row-locked for a write, moving it back from the archive if needed."""
+    find_hot_lead = db.query(DBLead).filter(DBLead.id == lead_id).with_for_update()
+    lead = find_hot_lead.first()
+    if lead:
+        return lead
+    archived_lead = db.query(LeadArchive).filter(LeadArchive.id == lead_id).with_for_update().first()
+    if archived_lead:
+        return restore_archived_lead(db, archived_lead)
+    # A concurrent restore may have committed while we waited on the archive row lock
+    return find_hot_lead.first()
+
+
+def lock_or_restore_lead_by_phone(db: Session, phone_suffix: str) -> Optional[DBLead]:
+    """Same as lock_or_restore_lead, for the lead matching the last digits of a phone number."""
+    find_hot_lead = db.query(DBLead).filter(DBLead.phone.ilike(f"%{phone_suffix}")).with_for_update()
+    lead = find_hot_lead.first()
+    if lead:
+        return lead
+    archived_lead = find_archived_lead_by_phone(db, phone_suffix)
+    if archived_lead:
+        return restore_archived_lead(db, archived_lead)
+    return find_hot_lead.first()
+
+
+if __name__ == "__main__":
+    from app.database import get_session
+
+    session = get_session()
+    try:
+        count = archive_stale_leads(session)
+        print(f"Archived {count} leads in statuses {ARCHIVE_STATUSES} older than {ARCHIVE_AFTER_DAYS} days.")
+    finally:
+        session.close()
@@ -0,0 +1,94 @@
+# app/circuit_breaker.py
+#
+# Minimal circuit breaker for upstream APIs (Twilio, Stripe). After
+# `failure_threshold` consecutive upstream failures the circuit opens and calls fail
+# immediately with CircuitOpenError for `reset_timeout` seconds, instead of every
+# request waiting out a timeout against a degraded service. After that one trial call
+# is let through (half-open): success closes the circuit, failure re-opens it.
+
+import threading
+import time
+from typing import Callable
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"{name} is unavailable (circuit open, retry in {retry_in:.0f}s)")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        is_failure: Callable[[Exception], bool] = lambda e: True,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        # Decides which exceptions count against the upstream (e.g. not a 400 for a bad phone number)
+        self.is_failure = is_failure
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def _before_call(self):
+        with self._lock:
+            if self._state == CLOSED:
+                return
+            elapsed = time.monotonic() - self._opened_at
+            if self._state == OPEN and elapsed >= self.reset_timeout:
+                self._state = HALF_OPEN
+            if self._state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+            raise CircuitOpenError(self.name, max(self.reset_timeout - elapsed, 0))
+
+    def _on_success(self):
+        with self._lock:
+            if self._state != CLOSED:
+                print(f"Circuit '{self.name}' closed: upstream recovered.")
+            self._state = CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def _on_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    print(f"WARNING: Circuit '{self.name}' opened after {self._failures} failures.")
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+
+    def call(self, fn: Callable, *args, **kwargs):
+        self._before_call()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            if self.is_failure(e):
+                self._on_failure()
+            else:
+                # The upstream answered; the request itself was bad
+                self._on_success()
+            raise
+        self._on_success()
+        return result
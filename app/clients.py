@@ -0,0 +1,130 @@
+# app/clients.py
+#
+# Lazily constructed Twilio/Stripe clients. Importing either SDK is a large share of
+# the app's import time, so nothing here runs until a request actually needs it
+# (or the optional warm-up in main.lifespan).
+#
+# Both SDKs share one pooled keep-alive requests.Session with explicit connect/read
+# timeouts, and each upstream sits behind its own circuit breaker so a degraded
+# service fails fast instead of pinning workers.
+
+import os
+import threading
+
+from app.circuit_breaker import CircuitBreaker
+
+HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "4")) # Distinct hosts kept pooled
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "10")) # Keep-alive connections per host
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.05"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "2"))
+HTTP_RETRY_BACKOFF = float(os.getenv("HTTP_RETRY_BACKOFF", "0.3"))
+HTTP_RETRY_JITTER = float(os.getenv("HTTP_RETRY_JITTER", "0.3"))
+
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_SECONDS = float(os.getenv("BREAKER_RESET_SECONDS", "30"))
+
+HTTP_TIMEOUT = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+
+_lock = threading.RLock()
+_http_session = None
+_twilio_client = None
+_twilio_initialized = False
+_stripe = None
+
+
+def _is_twilio_failure(e: Exception) -> bool:
+    # A 4xx (bad number, unsubscribed recipient) means Twilio is up and answering
+    status_code = getattr(e, "status", None)
+    return not (isinstance(status_code, int) and status_code < 500)
+
+
+def _is_stripe_failure(e: Exception) -> bool:
+    # Card declines and invalid requests carry a 4xx http_status; connection errors carry none
+    status_code = getattr(e, "http_status", None)
+    return not (isinstance(status_code, int) and status_code < 500)
+
+
+twilio_breaker = CircuitBreaker("twilio", BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_SECONDS, _is_twilio_failure)
+stripe_breaker = CircuitBreaker("stripe", BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_SECONDS, _is_stripe_failure)
+
+
+def get_http_session():
+    """Returns the shared keep-alive session used by both SDKs."""
+    global _http_session
+    if _http_session is not None:
+        return _http_session
+    with _lock:
+        if _http_session is None:
+            from requests import Session
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            # Default allowed_methods excludes POST, so an SMS or checkout session is never
+            # re-sent after it may have reached the server; connect failures are still retried
+            retry = Retry(
+                total=HTTP_MAX_RETRIES,
+                backoff_factor=HTTP_RETRY_BACKOFF,
+                backoff_jitter=HTTP_RETRY_JITTER,
+                status_forcelist=(502, 503, 504),
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE, max_retries=retry)
+            session = Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _http_session = session
+        return _http_session
+
+
+def get_twilio_client():
+    """Returns the shared Twilio Client, or None when credentials are missing or invalid."""
+    global _twilio_client, _twilio_initialized
+    if _twilio_initialized:
+        return _twilio_client
+    with _lock:
+        if _twilio_initialized:
+            return _twilio_client
+
+        account_sid = os.getenv("TWILIO_ACCOUNT_SID")
+        auth_token = os.getenv("TWILIO_AUTH_TOKEN")
+        if account_sid and auth_token:
+            try:
+                from twilio.http.http_client import TwilioHttpClient
+                from twilio.rest import Client
+
+                http_client = TwilioHttpClient(pool_connections=False)
+                http_client.session = get_http_session()
+                # Set after construction: the constructor only validates a single float
+                http_client.timeout = HTTP_TIMEOUT
+                _twilio_client = Client(account_sid, auth_token, http_client=http_client)
+                print("Twilio client initialized successfully.")
+            except Exception as e:
+                # Not marked initialized, so the next send retries instead of disabling SMS for the process
+                print(f"Error initializing Twilio client: {e}")
+                return None
+        else:
+            print("WARNING: Twilio credentials (TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN) not fully set. SMS sending will be disabled.")
+            if not os.getenv("TWILIO_PHONE_NUMBER"):
+                print("WARNING: TWILIO_PHONE_NUMBER is also not set.")
+
+        _twilio_initialized = True
+        return _twilio_client
+
+
+def get_stripe():
+    """Returns the stripe module with the API key and shared HTTP client applied."""
+    global _stripe
+    if _stripe is not None:
+        return _stripe
+    with _lock:
+        if _stripe is None:
+            import stripe
+            stripe.api_key = os.getenv("STRIPE_SECRET_KEY")
+            if not stripe.api_key:
+                print("WARNING: STRIPE_SECRET_KEY is not set. Stripe operations may fail.")
+            stripe.default_http_client = stripe.RequestsClient(session=get_http_session(), timeout=HTTP_TIMEOUT)
+            # Stripe retries POSTs safely with idempotency keys and its own jittered backoff
+            stripe.max_network_retries = HTTP_MAX_RETRIES
+            _stripe = stripe
+        return _stripe
@@ -1,26 +1,48 @@
 # app/database.py
+import os
+import threading
+
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
-SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL")
-if not SQLALCHEMY_DATABASE_URL:
-    raise Exception("DATABASE_URL environment variable is not set.")
-
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
-
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Bound to the engine the first time get_engine() runs; use get_session() rather than this directly
+_session_factory = sessionmaker(autocommit=False, autoflush=False)
 
 # Base class for declarative models - Defined here, before models import it
 Base = declarative_base()
 
+_engine = None
+_engine_lock = threading.Lock()
+
+# The engine (and the psycopg2 import behind it) is created on first use rather than
+# at import time, so serverless cold starts don't pay for it before the first request
+def get_engine():
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                database_url = os.getenv("DATABASE_URL")
+                if not database_url:
+                    raise Exception("DATABASE_URL environment variable is not set.")
+                _engine = create_engine(database_url)
+                _session_factory.configure(bind=_engine)
+    return _engine
+
+def get_session() -> Session:
+    """Returns a new Session, creating the engine first if nothing has yet."""
+    get_engine()
+    return _session_factory()
+
+# Kept for existing callers: SessionLocal() now works regardless of call order
+SessionLocal = get_session
+
 # Dependency to get the database session
 def get_db():
-    db: Session = SessionLocal()
+    db: Session = get_session()
     try:
         yield db
     finally:
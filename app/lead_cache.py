@@ -0,0 +1,176 @@
+# app/lead_cache.py
+#
+# Bounded LRU cache of serialized Lead responses for GET /api/leads/{lead_id}.
+#
+# Every write path calls mark_lead_changed(db, lead_id) before committing. That drops
+# the local entry and queues a Postgres NOTIFY which is delivered to every worker
+# (this one included) only when the transaction commits. Each worker's listener thread
+# then bumps the lead's version, so a read that raced the write - and may have
+# serialized pre-commit data - can never be served: entries are only valid for the
+# version they were read under.
+#
+# The cache is bypassed whenever the listener is not connected, since changes from
+# other workers would go unnoticed. LISTEN needs a session-mode connection; if
+# DATABASE_URL points at a transaction-mode pooler (e.g. Neon's -pooler host), set
+# LEAD_CACHE_LISTEN_URL to the direct connection string.
+#
+# Off by default on Vercel: a frozen serverless instance still looks connected when it
+# resumes, and could serve hits before the listener reads notifications buffered in
+# the meantime. Set LEAD_CACHE_SIZE explicitly to opt in there.
+
+import os
+import select
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+LEAD_CACHE_SIZE = int(os.getenv("LEAD_CACHE_SIZE", "0" if os.getenv("VERCEL") else "500"))
+NOTIFY_CHANNEL = "lead_cache"
+LISTEN_KEEPALIVE_SECONDS = 30
+LISTEN_RETRY_SECONDS = 5
+
+
+class LeadCache:
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict() # lead_id -> (version, payload)
+        self._versions = {} # lead_id -> version at last invalidation
+        self._version_floor = 0 # Reported for ids whose version was evicted, so old readers still miss
+        self._clock = 0
+        self._lock = threading.Lock()
+        self.stats = Counter()
+        self.listener_connected = False
+        self._listener_started = False
+
+    def version(self, lead_id: int) -> int:
+        with self._lock:
+            return self._versions.get(lead_id, self._version_floor)
+
+    def get(self, lead_id: int) -> Optional[bytes]:
+        self.ensure_listener()
+        if not self.listener_connected or self.max_size <= 0:
+            self.stats["bypass"] += 1
+            return None
+        with self._lock:
+            entry = self._entries.get(lead_id)
+            if entry is not None and entry[0] == self._versions.get(lead_id, self._version_floor):
+                self._entries.move_to_end(lead_id)
+                self.stats["hit"] += 1
+                return entry[1]
+        self.stats["miss"] += 1
+        return None
+
+    def put(self, lead_id: int, version: int, payload: bytes) -> None:
+        if not self.listener_connected or self.max_size <= 0:
+            return
+        with self._lock:
+            # A write landed while this payload was being read; it is already stale
+            if version != self._versions.get(lead_id, self._version_floor):
+                return
+            self._entries[lead_id] = (version, payload)
+            self._entries.move_to_end(lead_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.stats["eviction"] += 1
+            # Versions outlive entries but are bounded too
+            while len(self._versions) > self.max_size * 10:
+                evicted_id = next(iter(self._versions))
+                self._version_floor = max(self._version_floor, self._versions.pop(evicted_id))
+
+    def invalidate(self, lead_id: int, remote: bool = False) -> None:
+        with self._lock:
+            self._clock += 1
+            self._versions.pop(lead_id, None)
+            self._versions[lead_id] = self._clock
+            self._entries.pop(lead_id, None)
+        self.stats["invalidation_remote" if remote else "invalidation_local"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clock += 1
+            self._version_floor = self._clock
+            self._versions.clear()
+            self._entries.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            size = len(self._entries)
+        lookups = self.stats["hit"] + self.stats["miss"]
+        return {
+            **self.stats,
+            "size": size,
+            "max_size": self.max_size,
+            "hit_ratio": round(self.stats["hit"] / lookups, 3) if lookups else None,
+            "listener_connected": self.listener_connected,
+        }
+
+    def ensure_listener(self) -> None:
+        # Started on first use rather than at startup to keep cold starts cheap
+        if self._listener_started or self.max_size <= 0:
+            return
+        with self._lock:
+            if self._listener_started:
+                return
+            self._listener_started = True
+        threading.Thread(target=self._listen_forever, name="lead-cache-listener", daemon=True).start()
+
+    def _listen_forever(self) -> None:
+        import psycopg2
+        import psycopg2.extensions
+
+        from app.database import get_engine
+
+        listen_url = os.getenv("LEAD_CACHE_LISTEN_URL")
+        if not listen_url:
+            listen_url = get_engine().url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+        while True:
+            conn = None
+            try:
+                conn = psycopg2.connect(listen_url)
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cur:
+                    cur.execute(f"LISTEN {NOTIFY_CHANNEL}")
+                # Anything may have changed while we were not listening
+                self.clear()
+                self.listener_connected = True
+                print("Lead cache listener connected.")
+
+                while True:
+                    if select.select([conn], [], [], LISTEN_KEEPALIVE_SECONDS) == ([], [], []):
+                        # Quiet period: make sure the connection is still alive. Notifications
+                        # arriving meanwhile land in conn.notifies and are applied below.
+                        with conn.cursor() as cur:
+                            cur.execute("SELECT 1")
+                    else:
+                        conn.poll()
+                    while conn.notifies:
+                        notification = conn.notifies.pop(0)
+                        try:
+                            self.invalidate(int(notification.payload), remote=True)
+                        except ValueError:
+                            self.clear()
+            except Exception as e:
+                self.listener_connected = False
+                self.clear()
+                print(f"WARNING: Lead cache listener disconnected, cache bypassed until it reconnects: {e}")
+                time.sleep(LISTEN_RETRY_SECONDS)
+            finally:
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+
+
+lead_cache = LeadCache(LEAD_CACHE_SIZE)
+
+
+def mark_lead_changed(db: Session, lead_id: int) -> None:
+    """Call before committing a write to a lead; the NOTIFY is sent only if the commit succeeds."""
+    db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": NOTIFY_CHANNEL, "payload": str(lead_id)})
+    lead_cache.invalidate(lead_id)
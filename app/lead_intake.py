@@ -0,0 +1,126 @@
+# app/lead_intake.py
+#
+# Single-statement lead intake for POST /api/leads:
+#   INSERT ... VALUES (..., <fuzzy duplicate scan>) ON CONFLICT (phone) DO UPDATE ... RETURNING
+# A resubmission from the same phone is merged into the existing lead as a note instead
+# of failing on the unique constraint, and pg_trgm matches on name/email/VIN are stored
+# on the lead as possibleDuplicates for the owner - all in one round trip.
+
+import os
+import re
+from datetime import datetime, timezone
+from typing import Tuple
+
+from sqlalchemy import String, cast, func, literal_column, or_, select, text
+from sqlalchemy.dialects.postgresql import JSONB, insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.lead_cache import mark_lead_changed
+from app.models import Lead as DBLead
+
+DUPLICATE_SIMILARITY_THRESHOLD = float(os.getenv("DUPLICATE_SIMILARITY_THRESHOLD", "0.5"))
+MAX_POSSIBLE_DUPLICATES = 5
+
+
+def normalize_phone(phone: str) -> str:
+    """Reduces a US number to its 10 digits so '(626) 555-0100' and '626-555-0100' collide on the unique index."""
+    digits = re.sub(r"\D", "", phone or "")
+    if len(digits) == 11 and digits.startswith("1"):
+        digits = digits[1:]
+    return digits or phone
+
+
+def full_name_expr(table):
+    # Must stay identical to the ix_leads_full_name_trgm expression so the GIN index is used
+    return func.lower(table.c.firstName.concat(literal_column("' '")).concat(table.c.lastName))
+
+
+def _possible_duplicates_subquery(values: dict):
+    existing = DBLead.__table__.alias("existing")
+    name = f"{values['firstName']} {values['lastName']}".lower()
+    email = (values.get("email") or "").lower()
+    vin = (values.get("vin") or "").upper()
+
+    score = func.greatest(
+        func.similarity(full_name_expr(existing), name),
+        func.coalesce(func.similarity(func.lower(existing.c.email), email), 0),
+        func.coalesce(func.similarity(existing.c.vin, vin), 0) if vin else literal_column("0"),
+    ).label("score")
+
+    # '%' is the pg_trgm similarity operator; it is what lets the trigram GIN indexes be used
+    conditions = [full_name_expr(existing).op("%")(name)]
+    if email:
+        conditions.append(func.lower(existing.c.email).op("%")(email))
+    if vin:
+        conditions.append(existing.c.vin.op("%")(vin))
+
+    matches = (
+        select(
+            existing.c.id,
+            existing.c.firstName,
+            existing.c.lastName,
+            existing.c.email,
+            existing.c.vin,
+            score,
+        )
+        .where(existing.c.phone != values["phone"], or_(*conditions))
+        .order_by(score.desc())
+        .limit(MAX_POSSIBLE_DUPLICATES)
+        .subquery("matches")
+    )
+    return (
+        select(func.coalesce(func.jsonb_agg(literal_column("matches")), text("'[]'::jsonb")))
+        .select_from(matches)
+        .where(matches.c.score >= DUPLICATE_SIMILARITY_THRESHOLD)
+        .scalar_subquery()
+    )
+
+
+def upsert_lead(db: Session, values: dict, resubmission_note: str) -> Tuple[dict, bool]:
+    """Inserts a lead, or appends resubmission_note to the lead with the same phone.
+
+    Returns the resulting lead row as a dict and whether a new lead was created.
+    """
+    leads = DBLead.__table__
+    note = func.jsonb_build_object(
+        "id", cast(func.coalesce(func.jsonb_array_length(leads.c.messages), 0) + 1, String),
+        "sender", "client",
+        "message", resubmission_note,
+        "timestamp", datetime.now(timezone.utc).isoformat(),
+    )
+
+    insert_stmt = pg_insert(leads).values(
+        **values,
+        possibleDuplicates=_possible_duplicates_subquery(values),
+    )
+    stmt = insert_stmt.on_conflict_do_update(
+        index_elements=[leads.c.phone],
+        set_={
+            "messages": func.coalesce(leads.c.messages, cast(text("'[]'"), JSONB)).op("||")(func.jsonb_build_array(note)),
+            "possibleDuplicates": insert_stmt.excluded.possibleDuplicates,
+        },
+    ).returning(*leads.c, literal_column("(xmax = 0)").label("inserted"))
+
+    row = db.execute(stmt).mappings().one()
+    lead = dict(row)
+    inserted = lead.pop("inserted")
+    if not inserted:
+        mark_lead_changed(db, lead["id"])
+    db.commit()
+
+    return lead, inserted
+
+
+def format_resubmission_note(lead_data) -> str:
+    parts = [f"[Form resubmitted] {lead_data.year} {lead_data.make} {lead_data.model}".strip()]
+    if lead_data.glassToReplace:
+        parts.append(f"Glass: {', '.join(lead_data.glassToReplace)}")
+    if lead_data.addonServices:
+        parts.append(f"Add-ons: {', '.join(lead_data.addonServices)}")
+    if lead_data.damageDescription:
+        parts.append(f"Damage: {lead_data.damageDescription}")
+    if lead_data.email:
+        parts.append(f"Email: {lead_data.email}")
+    if lead_data.vin:
+        parts.append(f"VIN: {lead_data.vin}")
+    return "\n".join(parts)
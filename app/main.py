@@ -1,27 +1,62 @@
-from fastapi import FastAPI, HTTPException, status, Depends, Request
+from fastapi import FastAPI, HTTPException, status, Depends, Request, Response
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime, timezone
 from sqlalchemy.orm import Session
 from sqlalchemy.orm.attributes import flag_modified
+from sqlalchemy import text
+from contextlib import asynccontextmanager
+from starlette.concurrency import run_in_threadpool
 
-import stripe
 import os
 from fastapi.middleware.cors import CORSMiddleware
-from dotenv import load_dotenv
-from twilio.rest import Client
-
-from app.database import engine, Base, get_db
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+# Environment is loaded once, by app.database on import
+from app.database import get_db, get_session
+from app.clients import get_twilio_client, get_stripe, twilio_breaker, stripe_breaker
+from app.circuit_breaker import CircuitOpenError
+from app.admission import admission_control, check_phone_rate
 from app.models import Lead as DBLead
-from app.routes import stripe_routes
+from app.routes import stripe_routes, archive_routes, vin_routes, pricing_routes, scheduling_routes, admission_routes, lead_cache_routes
+from app.vin import apply_vin_to_lead_data, get_vin_index
+from app.pricing import compute_quote, get_price_index
+from app.lead_intake import upsert_lead, normalize_phone, format_resubmission_note
+from app.archive import get_archived_lead, lock_or_restore_lead, lock_or_restore_lead_by_phone
+from app.lead_cache import lead_cache, mark_lead_changed
 from app.schemas import LeadCreate, MessageCreate, QuotePayload, StripeCheckoutRequest, Lead, Message, FinalQuoteMessagePayload
 
 
+TWILIO_PHONE_NUMBER = os.getenv("TWILIO_PHONE_NUMBER")
+
+
+def warm_up():
+    # Pays the lazy-initialization costs up front: DB engine + first connection, SDK clients, VIN index
+    start = datetime.now(timezone.utc)
+    with get_session() as db:
+        db.execute(text("SELECT 1"))
+    get_twilio_client()
+    get_stripe()
+    get_vin_index()
+    print(f"Warm-up finished in {(datetime.now(timezone.utc) - start).total_seconds() * 1000:.0f} ms.")
 
-load_dotenv()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Off by default so serverless cold starts stay cheap; long-running servers can opt in
+    if os.getenv("WARMUP_ON_STARTUP", "").lower() in ("1", "true", "yes"):
+        try:
+            await run_in_threadpool(warm_up)
+        except Exception as e:
+            print(f"WARNING: Warm-up failed, continuing with lazy initialization: {e}")
+    yield
 
-app = FastAPI()
+
+app = FastAPI(lifespan=lifespan)
+
+# Added before CORS so it runs inside it and 429/503 responses still carry CORS headers
+app.add_middleware(admission_control)
 
 app.add_middleware(
     CORSMiddleware,
@@ -38,43 +73,32 @@ app.add_middleware(
 
 
 app.include_router(stripe_routes.router)
-
-
-stripe.api_key = os.getenv("STRIPE_SECRET_KEY")
-if not stripe.api_key:
-    print("WARNING: STRIPE_SECRET_KEY is not set. Stripe operations may fail.")
-
-TWILIO_ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID")
-TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN")
-TWILIO_PHONE_NUMBER = os.getenv("TWILIO_PHONE_NUMBER")
-
-twilio_client = None
-if TWILIO_ACCOUNT_SID and TWILIO_AUTH_TOKEN:
-    try:
-        twilio_client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
-        print("Twilio client initialized successfully.")
-    except Exception as e:
-        print(f"Error initializing Twilio client: {e}")
-else:
-    print("WARNING: Twilio credentials (TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN) not fully set. SMS sending will be disabled.")
-    if not TWILIO_PHONE_NUMBER:
-        print("WARNING: TWILIO_PHONE_NUMBER is also not set.")
+app.include_router(archive_routes.router)
+app.include_router(vin_routes.router)
+app.include_router(pricing_routes.router)
+app.include_router(scheduling_routes.router)
+app.include_router(admission_routes.router)
+app.include_router(lead_cache_routes.router)
 
 
 def send_sms(to_number: str, body: str):
     if not to_number.startswith('+'):
         to_number = f"+1{to_number.replace(' ', '').replace('-', '')}"
 
+    twilio_client = get_twilio_client()
     if not twilio_client or not TWILIO_PHONE_NUMBER:
         print(f"SMS not sent: Twilio client or phone number not configured. To: {to_number}, Message: '{body}'")
         return
     try:
-        message = twilio_client.messages.create(
+        message = twilio_breaker.call(
+            twilio_client.messages.create,
             to=to_number,
             from_=TWILIO_PHONE_NUMBER,
             body=body
         )
         print(f"SMS sent successfully to {to_number}. SID: {message.sid}")
+    except CircuitOpenError as e:
+        print(f"SMS not sent to {to_number}: {e}")
     except Exception as e:
         print(f"Failed to send SMS to {to_number}: {e}")
         if hasattr(e, 'code'):
@@ -119,12 +143,12 @@ class FinalQuoteMessagePayload(BaseModel):
 
 class QuotePayload(BaseModel):
     lead_id: int
-    total_amount: float
+    total_amount: Optional[float] = None # Computed from the price catalog when omitted
     payment_option: str
     deposit_amount: Optional[float] = None
     deposit_percentage: Optional[float] = None
     customer_name: str
-    services_summary: str
+    services_summary: Optional[str] = None # Computed from the price catalog when omitted
     appointment_slots: Optional[List[str]] = []
     invoice_description: Optional[str] = None
     make: str
@@ -142,6 +166,7 @@ class Lead(LeadBase):
     status: str
     createdAt: datetime
     messages: Optional[List[Message]] = []
+    possibleDuplicates: Optional[List[dict]] = []
 
     class Config:
         orm_mode = True
@@ -154,14 +179,38 @@ def get_all_leads(db: Session = Depends(get_db)):
 
 @app.get("/api/leads/{lead_id}", response_model=Lead)
 def get_single_lead(lead_id: int, db: Session = Depends(get_db)):
+    # Cache hits skip both the query and response_model serialization
+    cached = lead_cache.get(lead_id)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+
+    # Read before querying: a write committed meanwhile bumps it and the put below is dropped
+    version = lead_cache.version(lead_id)
     lead = db.query(DBLead).filter(DBLead.id == lead_id).first()
+    if not lead:
+        # Old closed leads live in leads_archive; they keep their original id
+        lead = get_archived_lead(db, lead_id)
     if not lead:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lead not found")
-    db.refresh(lead) # <--- ADDED THIS LINE
-    return lead
+
+    # Rendered the same way FastAPI renders response_model, so hits are byte-identical
+    response = JSONResponse(jsonable_encoder(Lead(**{c.name: getattr(lead, c.name) for c in DBLead.__table__.columns})))
+    lead_cache.put(lead_id, version, response.body)
+    return response
 
 @app.post("/api/leads", response_model=Lead, status_code=status.HTTP_201_CREATED)
 def create_new_lead(lead_data: LeadCreate, db: Session = Depends(get_db)):
+    apply_vin_to_lead_data(lead_data)
+    lead_data.phone = normalize_phone(lead_data.phone)
+
+    allowed, retry_after = check_phone_rate(lead_data.phone)
+    if not allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="We already have your request and will text you shortly.",
+            headers={"Retry-After": str(int(retry_after) + 1)},
+        )
+
     initial_message_body = (
         f"Hi {lead_data.firstName}, thanks for your inquiry with BizzyGlass! "
         f"We're reviewing your request and will get back to you shortly."
@@ -174,25 +223,36 @@ def create_new_lead(lead_data: LeadCreate, db: Session = Depends(get_db)):
         timestamp=datetime.now(timezone.utc).isoformat()
     )
 
-    db_lead = DBLead(
-        status="NEW",
-        createdAt=datetime.now(timezone.utc),
-        messages=[initial_message.dict()],
-        **lead_data.dict()
+    # Insert, or merge into the existing lead for this phone, in a single statement
+    db_lead, created = upsert_lead(
+        db,
+        dict(
+            status="NEW",
+            createdAt=datetime.now(timezone.utc),
+            messages=[initial_message.dict()],
+            **lead_data.dict()
+        ),
+        format_resubmission_note(lead_data),
     )
-    
-    db.add(db_lead)
-    db.commit()
-    db.refresh(db_lead)
 
-    send_sms(db_lead.phone, initial_message_body)
+    if db_lead["possibleDuplicates"]:
+        print(f"DEBUG: create_new_lead - Lead {db_lead['id']} has possible duplicates: {[d['id'] for d in db_lead['possibleDuplicates']]}")
+
+    if not created:
+        # Resubmission: the note was appended to the existing lead; don't greet the customer twice.
+        # This endpoint is public, so nothing stored on that lead is handed back to whoever knows the phone number.
+        print(f"DEBUG: create_new_lead - Merged resubmission into existing lead {db_lead['id']}.")
+        return JSONResponse({"status": "RECEIVED", "detail": "We already have your request and will text you shortly."})
 
-    return db_lead
+    send_sms(db_lead["phone"], initial_message_body)
+    # Duplicate matches name other customers; they are for the owner's dashboard only
+    return {**db_lead, "possibleDuplicates": []}
 
 @app.post("/api/leads/{lead_id}/messages", response_model=Lead)
 def add_message_to_lead(lead_id: int, message_data: MessageCreate, db: Session = Depends(get_db)):
     print(f"DEBUG: add_message_to_lead - Received message for lead {lead_id}: {message_data.message[:100]}...")
-    lead = db.query(DBLead).filter(DBLead.id == lead_id).first()
+    # Replying on an archived conversation reopens it
+    lead = lock_or_restore_lead(db, lead_id)
     if not lead:
         print(f"ERROR: add_message_to_lead - Lead {lead_id} not found for message update.")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lead not found")
@@ -214,6 +274,7 @@ def add_message_to_lead(lead_id: int, message_data: MessageCreate, db: Session =
     flag_modified(lead, "messages")
 
     db.add(lead)
+    mark_lead_changed(db, lead.id)
     db.commit()
     db.refresh(lead)
 
@@ -227,7 +288,8 @@ def add_message_to_lead(lead_id: int, message_data: MessageCreate, db: Session =
 def create_checkout_session(data: StripeCheckoutRequest):
     try:
         amount = int(data.full_amount * 100)
-        session = stripe.checkout.Session.create(
+        session = stripe_breaker.call(
+            get_stripe().checkout.Session.create,
             payment_method_types=["card"],
             line_items=[{
                 "price_data": {
@@ -243,12 +305,37 @@ def create_checkout_session(data: StripeCheckoutRequest):
             metadata={"lead_id": data.lead_id, "mode": data.mode},
         )
         return {"checkout_url": session.url}
+    except CircuitOpenError as e:
+        print(f"Stripe checkout session skipped: {e}")
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
     except Exception as e:
         print(f"Error creating Stripe checkout session: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 @app.post("/api/generate-quote-message")
-def generate_quote_message(payload: QuotePayload):
+def generate_quote_message(payload: QuotePayload, db: Session = Depends(get_db)):
+    if payload.total_amount is None or payload.services_summary is None:
+        lead = db.query(DBLead).filter(DBLead.id == payload.lead_id).first()
+        if not lead:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lead not found")
+        estimate = compute_quote(lead, get_price_index(db), deposit_percentage=payload.deposit_percentage)
+        # Never send a payment link for a partial (or $0) total
+        if estimate.unpriced_items or (payload.total_amount is None and estimate.total_amount <= 0):
+            print(f"WARNING: generate_quote_message - No catalog price for lead {payload.lead_id} items: {estimate.unpriced_items}")
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail={
+                    "message": "Cannot compute the quote from the price catalog. Add catalog prices or send total_amount and services_summary.",
+                    "unpriced_items": estimate.unpriced_items,
+                },
+            )
+        if payload.total_amount is None:
+            payload.total_amount = estimate.total_amount
+            if payload.deposit_amount is None and payload.payment_option in ["deposit", "both"]:
+                payload.deposit_amount = estimate.deposit_amount
+        if payload.services_summary is None:
+            payload.services_summary = estimate.services_summary
+
     full_url = None
     deposit_url = None
     quote_message_body = ""
@@ -329,7 +416,7 @@ def generate_quote_message(payload: QuotePayload):
 @app.post("/api/send-final-quote", response_model=Lead)
 def send_final_quote(payload: FinalQuoteMessagePayload, db: Session = Depends(get_db)):
     print(f"DEBUG: send_final_quote - Received final message for lead {payload.lead_id}: {payload.message_content[:100]}...")
-    lead = db.query(DBLead).filter(DBLead.id == payload.lead_id).first()
+    lead = lock_or_restore_lead(db, payload.lead_id)
     if not lead:
         print(f"ERROR: send_final_quote - Lead {payload.lead_id} not found for message update.")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lead not found")
@@ -351,6 +438,7 @@ def send_final_quote(payload: FinalQuoteMessagePayload, db: Session = Depends(ge
     flag_modified(lead, "messages")
 
     db.add(lead)
+    mark_lead_changed(db, lead.id)
     db.commit()
     db.refresh(lead)
 
@@ -359,24 +447,16 @@ def send_final_quote(payload: FinalQuoteMessagePayload, db: Session = Depends(ge
     send_sms(lead.phone, new_message.message)
     return lead
 
-@app.post("/api/twilio-webhook")
-async def receive_incoming_sms(request: Request, db: Session = Depends(get_db)):
-    form_data = await request.form()
-    from_number = form_data.get("From")
-    body = form_data.get("Body")
-    timestamp = datetime.now(timezone.utc).isoformat()
-
-    if not from_number or not body:
-        raise HTTPException(status_code=400, detail="Missing From or Body")
-
+def append_incoming_sms(db: Session, from_number: str, body: str, timestamp: str) -> bool:
+    """Appends a customer's reply to their lead. Returns False when no lead matches the number."""
     # Normalize number for DB matching
     normalized_number = from_number.replace("+1", "").replace("-", "").replace(" ", "")
 
-    # Find the matching lead by phone number
-    lead = db.query(DBLead).filter(DBLead.phone.ilike(f"%{normalized_number[-10:]}")).first()
+    # Locked so concurrent replies append one after another; a reply on an archived lead
+    # makes it active again, so it is moved back to the hot table
+    lead = lock_or_restore_lead_by_phone(db, normalized_number[-10:])
     if not lead:
-        print(f"No matching lead found for number: {from_number}")
-        return "OK"
+        return False
 
     if lead.messages is None:
         lead.messages = []
@@ -391,10 +471,24 @@ async def receive_incoming_sms(request: Request, db: Session = Depends(get_db)):
     flag_modified(lead, "messages")
 
     db.add(lead)
+    mark_lead_changed(db, lead.id)
     db.commit()
+    return True
 
-    print(f"📩 Received reply from {from_number}: {body}")
-    return "OK"
+@app.post("/api/twilio-webhook")
+async def receive_incoming_sms(request: Request, db: Session = Depends(get_db)):
+    form_data = await request.form()
+    from_number = form_data.get("From")
+    body = form_data.get("Body")
+    timestamp = datetime.now(timezone.utc).isoformat()
 
+    if not from_number or not body:
+        raise HTTPException(status_code=400, detail="Missing From or Body")
 
+    # Blocking DB work (including waits on row locks) must stay off the event loop
+    if not await run_in_threadpool(append_incoming_sms, db, from_number, body, timestamp):
+        print(f"No matching lead found for number: {from_number}")
+        return "OK"
 
+    print(f"📩 Received reply from {from_number}: {body}")
+    return "OK"
@@ -1,6 +1,6 @@
 # app/models.py
 
-from sqlalchemy import Column, Integer, String, DateTime, Text
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index, Numeric, Boolean, Time, ForeignKey
 from sqlalchemy.dialects.postgresql import JSONB # Keep JSONB import
 from sqlalchemy.sql import func
 from sqlalchemy.ext.mutable import MutableList # Import MutableList
@@ -41,3 +41,98 @@ class Lead(Base):
     preferredDate = Column(String, nullable=True)
     preferredTime = Column(String, nullable=True)
     preferredDaysTimes = Column(MutableList.as_mutable(JSONB), default=[])
+
+    # Fuzzy name/email/VIN matches found at intake (see app/lead_intake.py), for the owner to review
+    possibleDuplicates = Column(JSONB, default=[])
+
+    # Lets the archival job find terminal leads past the cutoff without a seq scan
+    __table_args__ = (
+        Index("ix_leads_status_createdAt", "status", "createdAt"),
+    )
+
+
+# Cold storage for leads in terminal statuses (see app/archive.py).
+# Mirrors the leads columns so rows can be copied back and forth with INSERT ... SELECT.
+class LeadArchive(Base):
+    __tablename__ = "leads_archive"
+
+    id = Column(Integer, primary_key=True)
+    firstName = Column(String)
+    lastName = Column(String)
+    phone = Column(String, index=True) # Not unique: a number can be archived more than once
+    email = Column(String, nullable=True)
+    make = Column(String)
+    model = Column(String)
+    year = Column(String)
+    bodyType = Column(String)
+    urgency = Column(String)
+    damageDescription = Column(Text)
+    status = Column(String)
+    createdAt = Column(DateTime(timezone=True), index=True)
+    messages = Column(MutableList.as_mutable(JSONB), default=[])
+    vin = Column(String, nullable=True)
+    glassToReplace = Column(MutableList.as_mutable(JSONB), default=[])
+    addonServices = Column(MutableList.as_mutable(JSONB), default=[])
+    preferredDate = Column(String, nullable=True)
+    preferredTime = Column(String, nullable=True)
+    preferredDaysTimes = Column(MutableList.as_mutable(JSONB), default=[])
+    possibleDuplicates = Column(JSONB, default=[])
+
+    archivedAt = Column(DateTime(timezone=True), server_default=func.now())
+
+
+# Price catalog for the quote engine (see app/pricing.py).
+# NULL make/model/bodyType/year bounds act as wildcards; the most specific match wins.
+class PriceCatalogEntry(Base):
+    __tablename__ = "price_catalog"
+
+    id = Column(Integer, primary_key=True, index=True)
+    category = Column(String, nullable=False, default="glass") # 'glass' or 'addon'
+    item = Column(String, nullable=False) # Glass position (e.g. 'Windshield') or add-on service name
+    glassType = Column(String, nullable=True) # 'OEM' or 'Aftermarket'; NULL for add-ons
+    make = Column(String, nullable=True)
+    model = Column(String, nullable=True)
+    yearMin = Column(Integer, nullable=True)
+    yearMax = Column(Integer, nullable=True)
+    bodyType = Column(String, nullable=True)
+    price = Column(Numeric(10, 2), nullable=False)
+    updatedAt = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+# Scheduling (see app/scheduling.py)
+class Technician(Base):
+    __tablename__ = "technicians"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=False)
+    active = Column(Boolean, default=True)
+
+
+# Recurring weekly working window, in the business timezone
+class TechnicianAvailability(Base):
+    __tablename__ = "technician_availability"
+
+    id = Column(Integer, primary_key=True, index=True)
+    technicianId = Column(Integer, ForeignKey("technicians.id", ondelete="CASCADE"), nullable=False, index=True)
+    weekday = Column(Integer, nullable=False) # 0 = Monday ... 6 = Sunday
+    startTime = Column(Time, nullable=False)
+    endTime = Column(Time, nullable=False)
+
+
+class Booking(Base):
+    __tablename__ = "bookings"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # No FK to leads: archived leads keep their id in leads_archive
+    leadId = Column(Integer, nullable=False, index=True)
+    technicianId = Column(Integer, ForeignKey("technicians.id"), nullable=False)
+    startsAt = Column(DateTime(timezone=True), nullable=False)
+    endsAt = Column(DateTime(timezone=True), nullable=False)
+    status = Column(String, default="BOOKED") # 'BOOKED' or 'CANCELLED'
+    createdAt = Column(DateTime(timezone=True), server_default=func.now())
+
+    # The migration also adds bookings_no_overlap, an EXCLUDE USING gist constraint
+    # that rejects overlapping BOOKED ranges for the same technician
+    __table_args__ = (
+        Index("ix_bookings_technicianId_startsAt", "technicianId", "startsAt"),
+    )
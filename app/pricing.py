@@ -0,0 +1,179 @@
+# app/pricing.py
+#
+# Server-side quote engine. The price_catalog table is compiled into an in-memory
+# index keyed by (category, item, glassType); each bucket is pre-sorted so the most
+# specific vehicle match is found first. The index is rebuilt only when the catalog
+# changes: edits through the API drop it immediately, and a cheap count/max(updatedAt)
+# fingerprint catches edits made by other workers or directly in the database (a
+# BEFORE UPDATE trigger from migration e2a9d5c13b47 bumps updatedAt on every update).
+
+import os
+import threading
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models import PriceCatalogEntry
+from app.schemas import QuoteEstimate, QuoteLineItem
+
+DEFAULT_DEPOSIT_PERCENTAGE = float(os.getenv("QUOTE_DEPOSIT_PERCENTAGE", "50"))
+
+OEM = "OEM"
+AFTERMARKET = "Aftermarket"
+# Checked on the public form when the customer prefers OEM glass; a preference, not a priced service
+OEM_UPGRADE_ADDON = "OEM Glass Upgrade (Select if you would prefer OEM glass)"
+
+CENTS = Decimal("0.01")
+
+
+def _norm(value) -> Optional[str]:
+    if value is None:
+        return None
+    value = str(value).strip().lower()
+    return value or None
+
+
+def _parse_year(value) -> Optional[int]:
+    try:
+        return int(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+
+
+class PriceIndex:
+    def __init__(self, entries: List[PriceCatalogEntry]):
+        self.buckets: Dict[Tuple[str, str, Optional[str]], list] = {}
+        for entry in entries:
+            key = (_norm(entry.category), _norm(entry.item), _norm(entry.glassType))
+            self.buckets.setdefault(key, []).append((
+                _norm(entry.make),
+                _norm(entry.model),
+                _norm(entry.bodyType),
+                entry.yearMin,
+                entry.yearMax,
+                Decimal(entry.price),
+                entry.id,
+            ))
+        for candidates in self.buckets.values():
+            # More criteria set == more specific; ties go to the lowest id for stable results
+            candidates.sort(key=lambda c: (-sum(v is not None for v in c[:5]), c[6]))
+
+    def lookup(self, category: str, item: str, glass_type: Optional[str], make, model, body_type, year) -> Optional[Tuple[Decimal, int]]:
+        make, model, body_type = _norm(make), _norm(model), _norm(body_type)
+        for c_make, c_model, c_body, year_min, year_max, price, entry_id in self.buckets.get((_norm(category), _norm(item), _norm(glass_type)), ()):
+            if c_make is not None and c_make != make:
+                continue
+            if c_model is not None and c_model != model:
+                continue
+            if c_body is not None and c_body != body_type:
+                continue
+            if (year_min is not None or year_max is not None) and year is None:
+                continue
+            if year_min is not None and year < year_min:
+                continue
+            if year_max is not None and year > year_max:
+                continue
+            return price, entry_id
+        return None
+
+
+_index: Optional[PriceIndex] = None
+_index_fingerprint = None
+_index_lock = threading.Lock()
+
+
+def _catalog_fingerprint(db: Session):
+    return tuple(db.query(func.count(PriceCatalogEntry.id), func.max(PriceCatalogEntry.updatedAt)).one())
+
+
+def invalidate_price_index() -> None:
+    global _index, _index_fingerprint
+    with _index_lock:
+        _index = None
+        _index_fingerprint = None
+
+
+def get_price_index(db: Session) -> PriceIndex:
+    global _index, _index_fingerprint
+    fingerprint = _catalog_fingerprint(db)
+    with _index_lock:
+        if _index is None or fingerprint != _index_fingerprint:
+            _index = PriceIndex(db.query(PriceCatalogEntry).all())
+            _index_fingerprint = fingerprint
+            print(f"DEBUG: get_price_index - Rebuilt price index from {fingerprint[0]} catalog entries.")
+        return _index
+
+
+def canonical_glass_type(glass_type: str) -> str:
+    # Catalog lookups ignore case, so the summary sections must too
+    for canonical in (OEM, AFTERMARKET):
+        if _norm(glass_type) == _norm(canonical):
+            return canonical
+    raise ValueError(f"Unknown glass type: {glass_type!r}")
+
+
+def preferred_glass_type(lead) -> str:
+    return OEM if OEM_UPGRADE_ADDON in (lead.addonServices or []) else AFTERMARKET
+
+
+def format_services_summary(line_items: List[QuoteLineItem]) -> str:
+    # Same '## Section' / '• item: $price' layout the dashboard sends, so generate_quote_message can clean it
+    sections = [
+        ("## OEM Services", [li for li in line_items if li.category == "glass" and li.glassType == OEM]),
+        ("## Aftermarket Services", [li for li in line_items if li.category == "glass" and li.glassType == AFTERMARKET]),
+        ("## Add-ons", [li for li in line_items if li.category == "addon"]),
+    ]
+    parts = []
+    for heading, items in sections:
+        if items:
+            parts.append(heading)
+            parts.extend(f"• {li.item}: ${li.price:.2f}" for li in items)
+    return "\n".join(parts)
+
+
+def compute_quote(
+    lead,
+    index: PriceIndex,
+    glass_type: Optional[str] = None,
+    deposit_percentage: Optional[float] = None,
+) -> QuoteEstimate:
+    glass_type = canonical_glass_type(glass_type) if glass_type else preferred_glass_type(lead)
+    deposit_percentage = DEFAULT_DEPOSIT_PERCENTAGE if deposit_percentage is None else deposit_percentage
+    year = _parse_year(lead.year)
+
+    wanted = [("glass", item, glass_type) for item in (lead.glassToReplace or [])]
+    wanted += [("addon", item, None) for item in (lead.addonServices or []) if item != OEM_UPGRADE_ADDON]
+
+    line_items: List[QuoteLineItem] = []
+    unpriced_items: List[str] = []
+    total = Decimal("0")
+    for category, item, item_glass_type in wanted:
+        match = index.lookup(category, item, item_glass_type, lead.make, lead.model, lead.bodyType, year)
+        if match is None:
+            unpriced_items.append(item)
+            continue
+        price, entry_id = match
+        total += price
+        line_items.append(QuoteLineItem(
+            item=item,
+            category=category,
+            glassType=item_glass_type,
+            price=float(price),
+            catalog_entry_id=entry_id,
+        ))
+
+    total = total.quantize(CENTS, rounding=ROUND_HALF_UP)
+    deposit = (total * Decimal(str(deposit_percentage)) / 100).quantize(CENTS, rounding=ROUND_HALF_UP)
+
+    return QuoteEstimate(
+        lead_id=lead.id,
+        glass_type=glass_type,
+        line_items=line_items,
+        unpriced_items=unpriced_items,
+        total_amount=float(total),
+        deposit_percentage=deposit_percentage,
+        deposit_amount=float(deposit),
+        services_summary=format_services_summary(line_items),
+    )
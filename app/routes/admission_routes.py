@@ -0,0 +1,12 @@
+# app/routes/admission_routes.py
+
+from fastapi import APIRouter
+
+from app.admission import admission_stats
+
+router = APIRouter()
+
+# Per-worker counters for monitoring: admitted/shed/rate-limited requests and current load
+@router.get("/api/admission/stats")
+def get_admission_stats():
+    return admission_stats()
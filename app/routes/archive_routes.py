@@ -0,0 +1,21 @@
+# app/routes/archive_routes.py
+
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.archive import archive_stale_leads
+from app.database import get_db
+
+router = APIRouter()
+
+@router.post("/api/leads/archive")
+def run_lead_archival(
+    older_than_days: Optional[int] = Query(None, ge=0),
+    statuses: Optional[List[str]] = Query(None),
+    db: Session = Depends(get_db),
+):
+    # Defaults come from LEAD_ARCHIVE_AFTER_DAYS / LEAD_ARCHIVE_STATUSES
+    archived = archive_stale_leads(db, older_than_days=older_than_days, statuses=statuses)
+    return {"archived": archived}
@@ -0,0 +1,12 @@
+# app/routes/lead_cache_routes.py
+
+from fastapi import APIRouter
+
+from app.lead_cache import lead_cache
+
+router = APIRouter()
+
+# Per-worker counters for monitoring: hits/misses/bypasses, invalidations and listener health
+@router.get("/api/lead-cache/stats")
+def get_lead_cache_stats():
+    return lead_cache.snapshot()
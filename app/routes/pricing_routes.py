@@ -0,0 +1,76 @@
+# app/routes/pricing_routes.py
+
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.models import Lead as DBLead, PriceCatalogEntry as DBPriceCatalogEntry
+from app.pricing import compute_quote, get_price_index, invalidate_price_index
+from app.schemas import (
+    PriceCatalogEntry,
+    PriceCatalogEntryCreate,
+    QuoteEstimate,
+    QuoteEstimateRequest,
+    QuoteEstimateBatchRequest,
+)
+
+router = APIRouter()
+
+MAX_BATCH_SIZE = 200
+
+@router.get("/api/price-catalog", response_model=List[PriceCatalogEntry])
+def list_price_catalog(db: Session = Depends(get_db)):
+    return db.query(DBPriceCatalogEntry).order_by(DBPriceCatalogEntry.category, DBPriceCatalogEntry.item).all()
+
+@router.post("/api/price-catalog", response_model=PriceCatalogEntry, status_code=status.HTTP_201_CREATED)
+def create_price_catalog_entry(entry_data: PriceCatalogEntryCreate, db: Session = Depends(get_db)):
+    entry = DBPriceCatalogEntry(**entry_data.dict())
+    db.add(entry)
+    db.commit()
+    db.refresh(entry)
+    invalidate_price_index()
+    return entry
+
+@router.put("/api/price-catalog/{entry_id}", response_model=PriceCatalogEntry)
+def update_price_catalog_entry(entry_id: int, entry_data: PriceCatalogEntryCreate, db: Session = Depends(get_db)):
+    entry = db.query(DBPriceCatalogEntry).filter(DBPriceCatalogEntry.id == entry_id).first()
+    if not entry:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Price catalog entry not found")
+    for field, value in entry_data.dict().items():
+        setattr(entry, field, value)
+    db.commit()
+    db.refresh(entry)
+    invalidate_price_index()
+    return entry
+
+@router.delete("/api/price-catalog/{entry_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_price_catalog_entry(entry_id: int, db: Session = Depends(get_db)):
+    entry = db.query(DBPriceCatalogEntry).filter(DBPriceCatalogEntry.id == entry_id).first()
+    if not entry:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Price catalog entry not found")
+    db.delete(entry)
+    db.commit()
+    invalidate_price_index()
+
+@router.post("/api/leads/{lead_id}/quote-estimate", response_model=QuoteEstimate)
+def estimate_lead_quote(lead_id: int, options: QuoteEstimateRequest, db: Session = Depends(get_db)):
+    lead = db.query(DBLead).filter(DBLead.id == lead_id).first()
+    if not lead:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lead not found")
+    return compute_quote(lead, get_price_index(db), options.glass_type, options.deposit_percentage)
+
+@router.post("/api/quote-estimates/batch", response_model=List[QuoteEstimate])
+def estimate_quotes_batch(data: QuoteEstimateBatchRequest, db: Session = Depends(get_db)):
+    if len(data.lead_ids) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"At most {MAX_BATCH_SIZE} leads per request.")
+    index = get_price_index(db)
+    # One query for all leads; unknown ids are simply left out of the response
+    leads = db.query(DBLead).filter(DBLead.id.in_(data.lead_ids)).all()
+    leads_by_id = {lead.id: lead for lead in leads}
+    return [
+        compute_quote(leads_by_id[lead_id], index, data.glass_type, data.deposit_percentage)
+        for lead_id in data.lead_ids
+        if lead_id in leads_by_id
+    ]
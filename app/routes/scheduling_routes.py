@@ -0,0 +1,108 @@
+# app/routes/scheduling_routes.py
+
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.archive import get_archived_lead
+from app.database import get_db
+from app.models import (
+    Booking as DBBooking,
+    Lead as DBLead,
+    Technician as DBTechnician,
+    TechnicianAvailability as DBTechnicianAvailability,
+)
+from app.scheduling import SLOT_MINUTES, check_booking_slot, find_free_slots, normalize_booking_start
+from app.schemas import (
+    AppointmentSlot,
+    Booking,
+    BookingCreate,
+    Technician,
+    TechnicianCreate,
+    TechnicianAvailability,
+    TechnicianAvailabilityCreate,
+)
+
+router = APIRouter()
+
+@router.get("/api/technicians", response_model=List[Technician])
+def list_technicians(db: Session = Depends(get_db)):
+    return db.query(DBTechnician).order_by(DBTechnician.name).all()
+
+@router.post("/api/technicians", response_model=Technician, status_code=status.HTTP_201_CREATED)
+def create_technician(technician_data: TechnicianCreate, db: Session = Depends(get_db)):
+    technician = DBTechnician(**technician_data.dict())
+    db.add(technician)
+    db.commit()
+    db.refresh(technician)
+    return technician
+
+@router.post("/api/technicians/{technician_id}/availability", response_model=TechnicianAvailability, status_code=status.HTTP_201_CREATED)
+def add_technician_availability(technician_id: int, window: TechnicianAvailabilityCreate, db: Session = Depends(get_db)):
+    if not db.query(DBTechnician).filter(DBTechnician.id == technician_id).first():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Technician not found")
+    if not 0 <= window.weekday <= 6 or window.startTime >= window.endTime:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid availability window.")
+    availability = DBTechnicianAvailability(technicianId=technician_id, **window.dict())
+    db.add(availability)
+    db.commit()
+    db.refresh(availability)
+    return availability
+
+@router.get("/api/leads/{lead_id}/available-slots", response_model=List[AppointmentSlot])
+def get_available_slots(
+    lead_id: int,
+    count: int = Query(5, ge=1, le=50),
+    days: int = Query(14, ge=1, le=60),
+    db: Session = Depends(get_db),
+):
+    lead = db.query(DBLead).filter(DBLead.id == lead_id).first()
+    if not lead:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lead not found")
+    return find_free_slots(db, lead.preferredDaysTimes, count=count, days=days)
+
+@router.post("/api/bookings", response_model=Booking, status_code=status.HTTP_201_CREATED)
+def create_booking(booking_data: BookingCreate, db: Session = Depends(get_db)):
+    technician = db.query(DBTechnician).filter(DBTechnician.id == booking_data.technician_id).first()
+    if not technician or not technician.active:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Technician not found")
+
+    # No FK on bookings.leadId, so check both tables here
+    if not db.query(DBLead.id).filter(DBLead.id == booking_data.lead_id).first() and not get_archived_lead(db, booking_data.lead_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lead not found")
+
+    starts_at = normalize_booking_start(booking_data.starts_at)
+    windows = db.query(DBTechnicianAvailability).filter(DBTechnicianAvailability.technicianId == technician.id).all()
+    problem = check_booking_slot(windows, starts_at, datetime.now(timezone.utc))
+    if problem:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=problem)
+
+    booking = DBBooking(
+        leadId=booking_data.lead_id,
+        technicianId=booking_data.technician_id,
+        startsAt=starts_at,
+        endsAt=starts_at + timedelta(minutes=SLOT_MINUTES),
+        status="BOOKED",
+    )
+    db.add(booking)
+    try:
+        db.commit()
+    except IntegrityError:
+        # bookings_no_overlap rejected it: someone else took this slot first
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="That time slot is no longer available.")
+    db.refresh(booking)
+    return booking
+
+@router.delete("/api/bookings/{booking_id}", response_model=Booking)
+def cancel_booking(booking_id: int, db: Session = Depends(get_db)):
+    booking = db.query(DBBooking).filter(DBBooking.id == booking_id).first()
+    if not booking:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Booking not found")
+    booking.status = "CANCELLED"
+    db.commit()
+    db.refresh(booking)
+    return booking
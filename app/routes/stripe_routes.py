@@ -1,8 +1,10 @@
 # app/routes/stripe_routes.py
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, status
 from pydantic import BaseModel
-import stripe # Only import stripe, no dotenv or os needed here
+
+from app.circuit_breaker import CircuitOpenError
+from app.clients import get_stripe, stripe_breaker
 
 router = APIRouter()
 
@@ -12,19 +14,23 @@ class StripeLinkRequest(BaseModel):
 
 @router.post("/create-stripe-link")
 def create_stripe_link(data: StripeLinkRequest):
-    # Stripe API key is already set globally in main.py upon app startup
-    session = stripe.checkout.Session.create(
-        payment_method_types=["card"],
-        line_items=[{
-            "price_data": {
-                "currency": "usd",
-                "product_data": {"name": data.label},
-                "unit_amount": data.amount * 100,
-            },
-            "quantity": 1,
-        }],
-        mode="payment",
-        success_url="http://localhost:8080/success",
-        cancel_url="http://localhost:8080/cancel",
-    )
+    # Stripe is imported and keyed on first use (app/clients.py)
+    try:
+        session = stripe_breaker.call(
+            get_stripe().checkout.Session.create,
+            payment_method_types=["card"],
+            line_items=[{
+                "price_data": {
+                    "currency": "usd",
+                    "product_data": {"name": data.label},
+                    "unit_amount": data.amount * 100,
+                },
+                "quantity": 1,
+            }],
+            mode="payment",
+            success_url="http://localhost:8080/success",
+            cancel_url="http://localhost:8080/cancel",
+        )
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
     return {"url": session.url}
@@ -0,0 +1,22 @@
+# app/routes/vin_routes.py
+
+from typing import List
+
+from fastapi import APIRouter, HTTPException, status
+
+from app.schemas import VinDecodeRequest, VinBatchDecodeRequest, VinDecodeResult
+from app.vin import decode_vin
+
+router = APIRouter()
+
+MAX_BATCH_SIZE = 500
+
+@router.post("/api/vin/decode", response_model=VinDecodeResult)
+def decode_single_vin(data: VinDecodeRequest):
+    return decode_vin(data.vin)
+
+@router.post("/api/vin/decode-batch", response_model=List[VinDecodeResult])
+def decode_vin_batch(data: VinBatchDecodeRequest):
+    if len(data.vins) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"At most {MAX_BATCH_SIZE} VINs per request.")
+    return [decode_vin(vin) for vin in data.vins]
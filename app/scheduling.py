@@ -0,0 +1,201 @@
+# app/scheduling.py
+#
+# Appointment slot finder. Technician working windows and existing bookings for the
+# search horizon are loaded in two queries into an AvailabilityIndex; free slots are
+# then found in memory by walking each window and jumping past busy intervals with
+# bisect. Double-booking is prevented by the bookings_no_overlap exclusion constraint,
+# not by this module, so concurrent bookings are safe even if two owners pick the same slot.
+
+import os
+from bisect import bisect_right
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from sqlalchemy.orm import Session
+
+from app.models import Booking, Technician, TechnicianAvailability
+from app.schemas import AppointmentSlot
+
+BUSINESS_TIMEZONE = ZoneInfo(os.getenv("BUSINESS_TIMEZONE", "America/Los_Angeles"))
+SLOT_MINUTES = int(os.getenv("BOOKING_SLOT_MINUTES", "90"))
+SLOT_STEP_MINUTES = int(os.getenv("BOOKING_SLOT_STEP_MINUTES", "30"))
+MIN_NOTICE_MINUTES = int(os.getenv("BOOKING_MIN_NOTICE_MINUTES", "60"))
+
+WEEKDAYS = {
+    "monday": 0, "tuesday": 1, "wednesday": 2, "thursday": 3,
+    "friday": 4, "saturday": 5, "sunday": 6,
+}
+# The public form offers '<Weekday> Morning/Afternoon/Evening'
+DAY_PERIODS = {
+    "morning": (time(8, 0), time(12, 0)),
+    "afternoon": (time(12, 0), time(17, 0)),
+    "evening": (time(17, 0), time(20, 0)),
+}
+ALL_DAY = (time(0, 0), time(23, 59, 59))
+
+
+def parse_preferred_days_times(preferred: Optional[List[str]]) -> Optional[Dict[int, List[Tuple[time, time]]]]:
+    """Maps 'Monday Morning' style strings to {weekday: [(start, end)]}. None means no usable preference."""
+    windows: Dict[int, List[Tuple[time, time]]] = {}
+    for entry in preferred or []:
+        words = entry.strip().lower().split()
+        if not words or words[0] not in WEEKDAYS:
+            continue
+        period = DAY_PERIODS.get(words[1]) if len(words) > 1 else ALL_DAY
+        if period is None:
+            continue
+        windows.setdefault(WEEKDAYS[words[0]], []).append(period)
+    return windows or None
+
+
+def format_slot_label(start: datetime) -> str:
+    local = start.astimezone(BUSINESS_TIMEZONE)
+    hour = local.hour % 12 or 12
+    return f"{local:%Y-%m-%d} at {hour}:{local.minute:02d} {'AM' if local.hour < 12 else 'PM'}"
+
+
+class AvailabilityIndex:
+    def __init__(self, technicians: List[Technician], windows: List[TechnicianAvailability], bookings: List[Booking]):
+        self.technician_names = {t.id: t.name for t in technicians}
+        self.windows_by_weekday: Dict[int, List[Tuple[int, time, time]]] = {}
+        for w in windows:
+            if w.technicianId in self.technician_names:
+                self.windows_by_weekday.setdefault(w.weekday, []).append((w.technicianId, w.startTime, w.endTime))
+
+        # Bookings per technician never overlap (exclusion constraint), so starts and ends are both sorted
+        self.busy: Dict[int, Tuple[List[datetime], List[datetime]]] = {}
+        for b in bookings:
+            starts, ends = self.busy.setdefault(b.technicianId, ([], []))
+            starts.append(b.startsAt)
+            ends.append(b.endsAt)
+
+    def first_conflict_end(self, technician_id: int, start: datetime, end: datetime) -> Optional[datetime]:
+        """Returns the end of the booking overlapping [start, end), or None if the range is free."""
+        starts, ends = self.busy.get(technician_id, ((), ()))
+        i = bisect_right(ends, start)
+        if i < len(starts) and starts[i] < end:
+            return ends[i]
+        return None
+
+    def _free_starts(self, technician_id: int, window_start: datetime, start_before: datetime, window_end: datetime, earliest: datetime):
+        # A slot must start before start_before (the preferred period) and finish inside the working window
+        slot = timedelta(minutes=SLOT_MINUTES)
+        step = timedelta(minutes=SLOT_STEP_MINUTES)
+        cursor = window_start
+        while cursor < start_before and cursor + slot <= window_end:
+            if cursor < earliest:
+                cursor = _align_up(earliest, window_start, step)
+                continue
+            conflict_end = self.first_conflict_end(technician_id, cursor, cursor + slot)
+            if conflict_end is None:
+                yield cursor
+                cursor += step
+            else:
+                cursor = _align_up(conflict_end, window_start, step)
+
+    def next_free_slots(
+        self,
+        now: datetime,
+        count: int,
+        days: int,
+        preferences: Optional[Dict[int, List[Tuple[time, time]]]] = None,
+    ) -> List[AppointmentSlot]:
+        earliest = now + timedelta(minutes=MIN_NOTICE_MINUTES)
+        first_day = now.astimezone(BUSINESS_TIMEZONE).date()
+        slots: List[AppointmentSlot] = []
+
+        for offset in range(days):
+            day = first_day + timedelta(days=offset)
+            weekday = day.weekday()
+            if preferences is not None and weekday not in preferences:
+                continue
+
+            # One offer per start time per day; the first free technician takes it
+            day_starts: Dict[datetime, int] = {}
+            for technician_id, start_time, end_time in self.windows_by_weekday.get(weekday, ()):
+                for pref_start, pref_end in (preferences or {}).get(weekday, [ALL_DAY]):
+                    # Stay on the window's slot grid so every offer passes check_booking_slot
+                    segment_start = _align_up(_local(day, max(start_time, pref_start)), _local(day, start_time), timedelta(minutes=SLOT_STEP_MINUTES))
+                    start_before = _local(day, min(end_time, pref_end))
+                    for start in self._free_starts(technician_id, segment_start, start_before, _local(day, end_time), earliest):
+                        day_starts.setdefault(start, technician_id)
+
+            for start in sorted(day_starts):
+                technician_id = day_starts[start]
+                end = start + timedelta(minutes=SLOT_MINUTES)
+                slots.append(AppointmentSlot(
+                    technician_id=technician_id,
+                    technician_name=self.technician_names[technician_id],
+                    start=start,
+                    end=end,
+                    label=format_slot_label(start),
+                ))
+                if len(slots) >= count:
+                    return slots
+        return slots
+
+
+def _local(day: date, at: time) -> datetime:
+    return datetime.combine(day, at, tzinfo=BUSINESS_TIMEZONE)
+
+
+def _align_up(moment: datetime, origin: datetime, step: timedelta) -> datetime:
+    steps = -((origin - moment) // step) # ceil division
+    return origin + max(steps, 0) * step
+
+
+def build_availability_index(db: Session, start: datetime, end: datetime) -> AvailabilityIndex:
+    technicians = db.query(Technician).filter(Technician.active.is_(True)).all()
+    windows = db.query(TechnicianAvailability).filter(
+        TechnicianAvailability.technicianId.in_([t.id for t in technicians])
+    ).all() if technicians else []
+    bookings = (
+        db.query(Booking)
+        .filter(Booking.status == "BOOKED", Booking.startsAt < end, Booking.endsAt > start)
+        .order_by(Booking.technicianId, Booking.startsAt)
+        .all()
+    )
+    return AvailabilityIndex(technicians, windows, bookings)
+
+
+def suggest_slots(index: AvailabilityIndex, now: datetime, preferred_days_times: Optional[List[str]], count: int, days: int) -> List[AppointmentSlot]:
+    preferences = parse_preferred_days_times(preferred_days_times)
+    slots = index.next_free_slots(now, count, days, preferences)
+    if not slots and preferences is not None:
+        # Nothing inside the customer's preferred times; offer the earliest openings instead
+        slots = index.next_free_slots(now, count, days)
+    return slots
+
+
+def find_free_slots(db: Session, preferred_days_times: Optional[List[str]], count: int = 5, days: int = 14) -> List[AppointmentSlot]:
+    now = datetime.now(timezone.utc)
+    index = build_availability_index(db, now, now + timedelta(days=days + 1))
+    return suggest_slots(index, now, preferred_days_times, count, days)
+
+
+def check_booking_slot(windows: List[TechnicianAvailability], start: datetime, now: datetime) -> Optional[str]:
+    """Returns why [start, start + SLOT_MINUTES) can't be booked for a technician with these windows, or None."""
+    if start < now + timedelta(minutes=MIN_NOTICE_MINUTES):
+        return f"Bookings need at least {MIN_NOTICE_MINUTES} minutes notice."
+    end = start + timedelta(minutes=SLOT_MINUTES)
+    step = timedelta(minutes=SLOT_STEP_MINUTES)
+    day = start.astimezone(BUSINESS_TIMEZONE).date()
+    inside_window = False
+    for w in windows:
+        if w.weekday != day.weekday():
+            continue
+        window_start = _local(day, w.startTime)
+        if window_start <= start and end <= _local(day, w.endTime):
+            inside_window = True
+            if (start - window_start) % step == timedelta(0):
+                return None
+    if inside_window:
+        return f"Bookings must start on the {SLOT_STEP_MINUTES}-minute slot grid."
+    return "That time is outside the technician's working hours."
+
+
+def normalize_booking_start(starts_at: datetime) -> datetime:
+    if starts_at.tzinfo is None:
+        return starts_at.replace(tzinfo=BUSINESS_TIMEZONE)
+    return starts_at
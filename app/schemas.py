@@ -1,6 +1,6 @@
 from pydantic import BaseModel
-from datetime import datetime
-from typing import List, Optional
+from datetime import datetime, time
+from typing import List, Literal, Optional
 
 class Message(BaseModel):
     id: str
@@ -35,12 +35,12 @@ class MessageCreate(BaseModel):
 # NEW: QuotePayload model moved from main.py
 class QuotePayload(BaseModel):
     lead_id: int
-    total_amount: float
+    total_amount: Optional[float] = None # Computed from the price catalog when omitted
     payment_option: str  # 'full', 'deposit', 'both'
     deposit_amount: Optional[float] = None
     deposit_percentage: Optional[float] = None
     customer_name: str
-    services_summary: str
+    services_summary: Optional[str] = None # Computed from the price catalog when omitted
     appointment_slots: Optional[List[str]] = []
     invoice_description: Optional[str] = None
     make: str # Required for invoice description
@@ -64,6 +64,119 @@ class Lead(LeadBase):
     status: str
     createdAt: datetime
     messages: Optional[List[Message]] = []
+    possibleDuplicates: Optional[List[dict]] = []
+
+    class Config:
+        orm_mode = True
+
+# VIN decoding (app/vin.py)
+class VinDecodeRequest(BaseModel):
+    vin: str
+
+class VinBatchDecodeRequest(BaseModel):
+    vins: List[str]
+
+class VinDecodeResult(BaseModel):
+    vin: str
+    valid: bool
+    check_digit_valid: bool = False
+    wmi: Optional[str] = None
+    region: Optional[str] = None
+    make: Optional[str] = None
+    model: Optional[str] = None
+    year: Optional[str] = None
+    errors: List[str] = []
+
+
+# Price catalog and quote engine (app/pricing.py)
+class PriceCatalogEntryBase(BaseModel):
+    category: str = "glass" # 'glass' or 'addon'
+    item: str
+    glassType: Optional[str] = None # 'OEM' or 'Aftermarket'
+    make: Optional[str] = None
+    model: Optional[str] = None
+    yearMin: Optional[int] = None
+    yearMax: Optional[int] = None
+    bodyType: Optional[str] = None
+    price: float
+
+class PriceCatalogEntryCreate(PriceCatalogEntryBase):
+    pass
+
+class PriceCatalogEntry(PriceCatalogEntryBase):
+    id: int
+    updatedAt: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
+
+class QuoteLineItem(BaseModel):
+    item: str
+    category: str
+    glassType: Optional[str] = None
+    price: float
+    catalog_entry_id: int
+
+class QuoteEstimateRequest(BaseModel):
+    glass_type: Optional[Literal["OEM", "Aftermarket"]] = None # Overrides the lead's OEM/aftermarket preference
+    deposit_percentage: Optional[float] = None
+
+class QuoteEstimateBatchRequest(QuoteEstimateRequest):
+    lead_ids: List[int]
+
+class QuoteEstimate(BaseModel):
+    lead_id: int
+    glass_type: str
+    line_items: List[QuoteLineItem] = []
+    unpriced_items: List[str] = [] # Selected on the lead but missing from the catalog
+    total_amount: float
+    deposit_percentage: float
+    deposit_amount: float
+    services_summary: str
+
+
+# Scheduling (app/scheduling.py)
+class TechnicianCreate(BaseModel):
+    name: str
+    active: bool = True
+
+class Technician(TechnicianCreate):
+    id: int
+
+    class Config:
+        orm_mode = True
+
+class TechnicianAvailabilityCreate(BaseModel):
+    weekday: int # 0 = Monday ... 6 = Sunday
+    startTime: time
+    endTime: time
+
+class TechnicianAvailability(TechnicianAvailabilityCreate):
+    id: int
+    technicianId: int
+
+    class Config:
+        orm_mode = True
+
+class BookingCreate(BaseModel):
+    lead_id: int
+    technician_id: int
+    starts_at: datetime # Naive values are read in the business timezone
+
+class Booking(BaseModel):
+    id: int
+    leadId: int
+    technicianId: int
+    startsAt: datetime
+    endsAt: datetime
+    status: str
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class AppointmentSlot(BaseModel):
+    technician_id: int
+    technician_name: str
+    start: datetime
+    end: datetime
+    label: str # Same "YYYY-MM-DD at 9:00 AM" form the dashboard puts in QuotePayload.appointment_slots
@@ -0,0 +1,155 @@
+# app/vin.py
+#
+# Offline VIN decoder. Everything comes from app/data/vin_data.json, which is read
+# once into plain dicts so a decode is a handful of dict lookups - no network calls.
+
+import json
+import os
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from app.schemas import VinDecodeResult
+
+VIN_DATA_PATH = os.path.join(os.path.dirname(__file__), "data", "vin_data.json")
+
+VIN_LENGTH = 17
+
+# ISO 3779 transliteration for the check digit; I, O and Q never appear in a VIN
+_TRANSLITERATION = {
+    **{str(d): d for d in range(10)},
+    "A": 1, "B": 2, "C": 3, "D": 4, "E": 5, "F": 6, "G": 7, "H": 8,
+    "J": 1, "K": 2, "L": 3, "M": 4, "N": 5, "P": 7, "R": 9,
+    "S": 2, "T": 3, "U": 4, "V": 5, "W": 6, "X": 7, "Y": 8, "Z": 9,
+}
+_WEIGHTS = (8, 7, 6, 5, 4, 3, 2, 10, 0, 9, 8, 7, 6, 5, 4, 3, 2)
+
+# Position 10 cycles through these 30 codes starting at 1980 (and again at 2010)
+_YEAR_CODES = "ABCDEFGHJKLMNPRSTVWXY123456789"
+_YEAR_BY_CODE = {code: 1980 + i for i, code in enumerate(_YEAR_CODES)}
+
+
+class VinIndex:
+    """In-memory lookup tables built from the bundled data file."""
+
+    def __init__(self, data: dict):
+        self.regions: Dict[str, str] = data.get("regions", {})
+        self.wmi: Dict[str, str] = data.get("wmi", {})
+        # Longest pattern first so the most specific VDS match wins
+        self.vds: Dict[str, List[Tuple[str, str, Optional[str]]]] = {
+            wmi: sorted(
+                ((entry[0], entry[1], entry[2] if len(entry) > 2 else None) for entry in patterns),
+                key=lambda entry: len(entry[0]),
+                reverse=True,
+            )
+            for wmi, patterns in data.get("vds", {}).items()
+        }
+
+    def lookup_wmi(self, vin: str) -> Tuple[Optional[str], Optional[str]]:
+        wmi = vin[:3]
+        # Low-volume manufacturers use a '9' in position 3 and continue the WMI in positions 12-14
+        if wmi[2] == "9" and wmi + vin[11:14] in self.wmi:
+            wmi = wmi + vin[11:14]
+        return wmi, self.wmi.get(wmi)
+
+    def lookup_vds(self, wmi: str, vin: str) -> Tuple[Optional[str], Optional[str]]:
+        descriptor = vin[3:8]
+        for pattern, model, make in self.vds.get(wmi, ()):
+            if descriptor.startswith(pattern):
+                return model, make
+        return None, None
+
+
+@lru_cache(maxsize=1)
+def get_vin_index() -> VinIndex:
+    with open(VIN_DATA_PATH, encoding="utf-8") as f:
+        return VinIndex(json.load(f))
+
+
+def normalize_vin(vin: str) -> str:
+    return vin.strip().upper().replace(" ", "").replace("-", "")
+
+
+def compute_check_digit(vin: str) -> Optional[str]:
+    try:
+        total = sum(_TRANSLITERATION[char] * weight for char, weight in zip(vin, _WEIGHTS))
+    except KeyError:
+        return None
+    remainder = total % 11
+    return "X" if remainder == 10 else str(remainder)
+
+
+def decode_model_year(vin: str) -> Optional[int]:
+    year = _YEAR_BY_CODE.get(vin[9])
+    if year is None:
+        return None
+    # North American passenger vehicles use a letter in position 7 from 2010 onwards
+    if vin[6].isalpha():
+        year += 30
+    if year > datetime.now().year + 1:
+        year -= 30
+    return year
+
+
+def decode_vin(raw_vin: str) -> VinDecodeResult:
+    vin = normalize_vin(raw_vin or "")
+    errors: List[str] = []
+
+    if len(vin) != VIN_LENGTH:
+        errors.append(f"VIN must be {VIN_LENGTH} characters, got {len(vin)}.")
+        return VinDecodeResult(vin=vin, valid=False, errors=errors)
+    invalid_chars = sorted({char for char in vin if char not in _TRANSLITERATION})
+    if invalid_chars:
+        errors.append(f"VIN contains invalid characters: {', '.join(invalid_chars)}.")
+        return VinDecodeResult(vin=vin, valid=False, errors=errors)
+
+    check_digit_valid = compute_check_digit(vin) == vin[8]
+    if not check_digit_valid:
+        # Required in North America only, so a mismatch is reported rather than rejected
+        errors.append("Check digit does not match.")
+
+    index = get_vin_index()
+    wmi, make = index.lookup_wmi(vin)
+    model, make_override = index.lookup_vds(wmi, vin)
+    model_year = decode_model_year(vin)
+
+    return VinDecodeResult(
+        vin=vin,
+        valid=True,
+        check_digit_valid=check_digit_valid,
+        wmi=wmi,
+        region=index.regions.get(vin[0]),
+        make=make_override or make,
+        model=model,
+        year=str(model_year) if model_year else None,
+        errors=errors,
+    )
+
+
+def apply_vin_to_lead_data(lead_data) -> None:
+    """Fills make/model/year on an incoming LeadCreate from its VIN, in place.
+
+    A VIN with a valid check digit is trusted over what the customer typed. If it names a
+    different make, the typed vehicle is replaced as a whole - model and year included,
+    cleared when the VIN doesn't decode them - so a Ford make is never paired with a typed
+    Toyota model. Otherwise decoded values only fill fields left blank or set to 'Other'.
+    """
+    if not lead_data.vin:
+        return
+    decoded = decode_vin(lead_data.vin)
+    if not decoded.valid:
+        return
+    lead_data.vin = decoded.vin
+
+    typed_make = (lead_data.make or "").strip()
+    if decoded.check_digit_valid and decoded.make and typed_make.lower() != decoded.make.lower():
+        lead_data.make = decoded.make
+        lead_data.model = decoded.model or ""
+        lead_data.year = decoded.year or ""
+        return
+
+    for field in ("make", "model", "year"):
+        value = getattr(decoded, field)
+        current = (getattr(lead_data, field) or "").strip()
+        if value and (decoded.check_digit_valid or not current or current == "Other"):
+            setattr(lead_data, field, value)
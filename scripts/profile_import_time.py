@@ -0,0 +1,133 @@
+# scripts/profile_import_time.py
+#
+# Measures how long `import app.main` takes in a fresh interpreter - the part of a
+# serverless cold start we control - and fails if an SDK that should load lazily is
+# imported eagerly, or if the import is not clearly faster than before lazy loading.
+#
+#   python scripts/profile_import_time.py                # 5 runs each, vs. the baseline ref
+#   python scripts/profile_import_time.py --runs 15 --top 20
+#   python scripts/profile_import_time.py --no-baseline --budget-ms 700
+#
+# Import time depends heavily on the machine, so there is no fixed default budget.
+# Instead the same measurement is taken in a temporary git worktree of BASELINE_REF,
+# the last commit before Twilio/Stripe/psycopg2 were made lazy, and the current tree
+# must be at least MIN_SAVING_PERCENT faster (best run vs. best run). On the dev box
+# (15 runs each) the baseline took 734 ms and the lazy-init commit 639 ms, a 13% saving.
+#
+# Uses `python -X importtime`, so the numbers match what a cold worker pays.
+# Set DATABASE_URL etc. as in production; nothing here connects to the database.
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_REF = os.getenv("IMPORT_TIME_BASELINE_REF", "a274281")
+MIN_SAVING_PERCENT = float(os.getenv("IMPORT_TIME_MIN_SAVING_PERCENT", "5"))
+# Optional absolute budget for a known machine, e.g. in CI
+BUDGET_MS = float(os.environ["IMPORT_TIME_BUDGET_MS"]) if os.getenv("IMPORT_TIME_BUDGET_MS") else None
+# Must stay out of the import path until first use (see app/clients.py, app/database.py)
+LAZY_MODULES = ["stripe", "twilio", "twilio.rest", "psycopg2", "requests"]
+
+
+def run_once(module: str, cwd: str = REPO_ROOT):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        sys.exit(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    # -X importtime prints each module after its dependencies, indented by depth
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line.split("|", 2)
+        entries.append((name.strip(), int(cumulative_us), len(name) - len(name.lstrip())))
+    return entries
+
+
+def direct_dependencies(entries, module: str):
+    position = next(i for i, (name, _, _) in enumerate(entries) if name == module)
+    indent = entries[position][2]
+    children = []
+    for name, cumulative_us, child_indent in reversed(entries[:position]):
+        if child_indent <= indent:
+            break
+        if child_indent == indent + 2:
+            children.append((name, cumulative_us))
+    return sorted(children, key=lambda item: item[1], reverse=True)
+
+
+def module_times_ms(runs, module: str):
+    return [next(us for name, us, _ in entries if name == module) / 1000 for entries in runs]
+
+
+def measure_baseline(ref: str, module: str, count: int) -> float:
+    """Best import time of module at git ref, measured from a temporary worktree."""
+    worktree = tempfile.mkdtemp(prefix="import-baseline-")
+    try:
+        subprocess.run(["git", "worktree", "add", "--detach", worktree, ref], cwd=REPO_ROOT, check=True, capture_output=True)
+        return min(module_times_ms([run_once(module, cwd=worktree) for _ in range(count)], module))
+    finally:
+        subprocess.run(["git", "worktree", "remove", "--force", worktree], cwd=REPO_ROOT, capture_output=True)
+        shutil.rmtree(worktree, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--baseline-ref", default=BASELINE_REF, help="Git ref measured for comparison")
+    parser.add_argument("--no-baseline", action="store_true", help="Skip the baseline comparison (e.g. no git checkout)")
+    parser.add_argument("--min-saving-percent", type=float, default=MIN_SAVING_PERCENT)
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS, help="Optional absolute budget")
+    parser.add_argument("--top", type=int, default=15, help="Slowest direct dependencies to list")
+    args = parser.parse_args()
+
+    runs = [run_once(args.module) for _ in range(args.runs)]
+    totals_ms = module_times_ms(runs, args.module)
+    median_ms = statistics.median(totals_ms)
+    # The fastest run is the least disturbed by other load on the machine, so that is what's compared
+    best_ms = min(totals_ms)
+    median_run = runs[totals_ms.index(sorted(totals_ms)[len(totals_ms) // 2])]
+
+    print(f"import {args.module}: median {median_ms:.1f} ms over {args.runs} runs "
+          f"(min {best_ms:.1f}, max {max(totals_ms):.1f})")
+    print(f"\nSlowest direct imports of {args.module}:")
+    for name, us in direct_dependencies(median_run, args.module)[:args.top]:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+
+    failures = []
+    imported = {name for name, _, _ in median_run}
+    eager = [name for name in LAZY_MODULES if name in imported]
+    if eager:
+        failures.append(f"imported eagerly, should be lazy: {', '.join(eager)}")
+
+    if not args.no_baseline:
+        baseline_ms = measure_baseline(args.baseline_ref, args.module, args.runs)
+        saving = (baseline_ms - best_ms) / baseline_ms * 100
+        print(f"\nBaseline {args.baseline_ref}: best {baseline_ms:.1f} ms; current is {saving:.1f}% faster "
+              f"(required {args.min_saving_percent:.0f}%)")
+        if saving < args.min_saving_percent:
+            failures.append(f"only {saving:.1f}% faster than {args.baseline_ref}, required {args.min_saving_percent:.0f}%")
+
+    if args.budget_ms is not None and best_ms > args.budget_ms:
+        failures.append(f"over the {args.budget_ms:.0f} ms budget by {best_ms - args.budget_ms:.1f} ms")
+
+    for failure in failures:
+        print(f"\nFAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print("\nOK")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,7 +8,7 @@ import { Badge } from '@/components/ui/badge';
 import { Label } from '@/components/ui/label';
 import { Separator } from '@/components/ui/separator';
 import { RadioGroup, RadioGroupItem } from '@/components/ui/radio-group';
-import { X, Send, DollarSign, Calendar, Clock, Phone, Mail, Car, User, MessageSquare, CreditCard, CheckCircle, Percent } from 'lucide-react';
+import { X, Send, DollarSign, Calendar, Clock, Phone, Mail, Car, User, MessageSquare, CreditCard, CheckCircle, Percent, AlertCircle } from 'lucide-react';
 import { toast } from '@/hooks/use-toast';
 import { StripeLinkGenerator } from './stripelinkgenerator';
 import { useEffect, useRef } from 'react';
@@ -35,6 +35,17 @@ interface Lead {
   preferredDate?: string;
   preferredTime?: string;
   preferredDaysTimes?: string[];
+  possibleDuplicates?: PossibleDuplicate[];
+}
+
+// Other leads with a similar name, email or VIN, flagged by the backend at intake
+interface PossibleDuplicate {
+  id: number;
+  firstName: string;
+  lastName: string;
+  email?: string;
+  vin?: string;
+  score: number;
 }
 
 interface Message {
@@ -503,6 +514,26 @@ const LeadDetail = ({ lead, onClose, onLeadUpdate }: LeadDetailProps) => {
             </h3>
             {getStatusBadge(lead.status)}
           </div>
+
+          {/* Possible Duplicates */}
+          {lead.possibleDuplicates && lead.possibleDuplicates.length > 0 && (
+            <div className="rounded-md border border-yellow-200 bg-yellow-50 p-3 text-sm">
+              <div className="flex items-center font-medium text-yellow-800">
+                <AlertCircle className="h-4 w-4 mr-2" />
+                Possible duplicate of {lead.possibleDuplicates.length === 1 ? 'another lead' : `${lead.possibleDuplicates.length} other leads`}
+              </div>
+              <ul className="mt-2 space-y-1 text-yellow-900">
+                {lead.possibleDuplicates.map((dup) => (
+                  <li key={dup.id}>
+                    #{dup.id} {dup.firstName} {dup.lastName}
+                    {dup.email && <span className="text-yellow-700"> · {dup.email}</span>}
+                    {dup.vin && <span className="text-yellow-700"> · VIN {dup.vin}</span>}
+                    <span className="text-yellow-700"> ({Math.round(dup.score * 100)}% match)</span>
+                  </li>
+                ))}
+              </ul>
+            </div>
+          )}
           
           {/* Contact Information */}
           <div className="space-y-2 text-sm">
@@ -0,0 +1,159 @@
+import asyncio
+
+import pytest
+
+from app import admission
+from app.admission import AdmissionControlMiddleware, TokenBucketLimiter, client_ip
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(admission.time, "monotonic", clock)
+    return clock
+
+
+def test_token_bucket_allows_burst_then_limits(clock):
+    limiter = TokenBucketLimiter(rate_per_second=0.5, burst=3)
+    assert [limiter.allow("a")[0] for _ in range(3)] == [True, True, True]
+    allowed, retry_after = limiter.allow("a")
+    assert not allowed
+    assert retry_after == pytest.approx(2.0)
+    # Other keys have their own bucket
+    assert limiter.allow("b")[0]
+
+
+def test_token_bucket_refills_up_to_burst(clock):
+    limiter = TokenBucketLimiter(rate_per_second=0.5, burst=2)
+    limiter.allow("a")
+    limiter.allow("a")
+    clock.now += 2
+    assert limiter.allow("a")[0]
+    assert not limiter.allow("a")[0]
+    clock.now += 3600
+    assert [limiter.allow("a")[0] for _ in range(3)] == [True, True, False]
+
+
+def test_token_bucket_evicts_least_recently_seen_key(clock):
+    limiter = TokenBucketLimiter(rate_per_second=0.001, burst=1, max_keys=2)
+    limiter.allow("a")
+    limiter.allow("b")
+    limiter.allow("c")
+    # "a" was evicted, so it starts over with a full bucket; "c" is still tracked
+    assert limiter.allow("a")[0]
+    assert not limiter.allow("c")[0]
+
+
+def scope(path="/api/leads", method="POST", headers=(), client=("203.0.113.7", 5000)):
+    return {"type": "http", "method": method, "path": path, "headers": list(headers), "client": client}
+
+
+def test_client_ip_ignores_forwarded_for_without_trusted_proxies(monkeypatch):
+    monkeypatch.setattr(admission, "TRUSTED_PROXY_HOPS", 0)
+    assert client_ip(scope(headers=[(b"x-forwarded-for", b"198.51.100.1")])) == "203.0.113.7"
+
+
+def test_client_ip_takes_entry_appended_by_trusted_proxy(monkeypatch):
+    monkeypatch.setattr(admission, "TRUSTED_PROXY_HOPS", 1)
+    spoofed = [(b"x-forwarded-for", b"1.2.3.4, 198.51.100.1")]
+    assert client_ip(scope(headers=spoofed)) == "198.51.100.1"
+
+
+class BlockingApp:
+    """Downstream app whose requests stay in flight until released."""
+
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.started = 0
+
+    async def __call__(self, scope, receive, send):
+        self.started += 1
+        await self.release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+
+async def request(middleware, request_scope):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    await middleware(request_scope, receive, send)
+    return messages[0]["status"]
+
+
+@pytest.fixture
+def fresh_limits(monkeypatch):
+    monkeypatch.setattr(admission, "ip_limiter", TokenBucketLimiter(rate_per_second=1, burst=100))
+    monkeypatch.setattr(admission, "OWNER_QUEUE_TIMEOUT", 0.05)
+    monkeypatch.setattr(admission, "counters", admission.Counter())
+
+
+def test_intake_is_shed_while_owner_slots_stay_reserved(fresh_limits):
+    async def scenario():
+        app = BlockingApp()
+        middleware = AdmissionControlMiddleware(app, capacity=3, owner_reserved=1)
+        in_flight = [asyncio.create_task(request(middleware, scope())) for _ in range(2)]
+        await asyncio.sleep(0.01)
+
+        # Intake may only use capacity - owner_reserved slots
+        assert await request(middleware, scope()) == 503
+        # The owner still gets the reserved slot
+        owner = asyncio.create_task(request(middleware, scope(path="/api/leads/1", method="GET")))
+        await asyncio.sleep(0.01)
+        assert app.started == 3
+
+        app.release.set()
+        assert await asyncio.gather(*in_flight, owner) == [200, 200, 200]
+        assert middleware.in_flight == 0
+
+    asyncio.run(scenario())
+    assert admission.counters["shed_intake"] == 1
+    assert admission.counters["admitted_owner"] == 1
+
+
+def test_owner_queues_briefly_then_is_shed(fresh_limits):
+    async def scenario():
+        app = BlockingApp()
+        middleware = AdmissionControlMiddleware(app, capacity=1, owner_reserved=0)
+        first = asyncio.create_task(request(middleware, scope(path="/api/leads", method="GET")))
+        await asyncio.sleep(0.01)
+        assert await request(middleware, scope(path="/api/leads", method="GET")) == 503
+
+        # A slot freed within the queue timeout is handed to the waiting owner request
+        waiting = asyncio.create_task(request(middleware, scope(path="/api/leads", method="GET")))
+        await asyncio.sleep(0.01)
+        app.release.set()
+        assert await asyncio.gather(first, waiting) == [200, 200]
+
+    asyncio.run(scenario())
+    assert admission.counters["shed_owner"] == 1
+
+
+def test_intake_rate_limited_per_ip(monkeypatch, fresh_limits):
+    monkeypatch.setattr(admission, "ip_limiter", TokenBucketLimiter(rate_per_second=0.001, burst=1))
+
+    async def scenario():
+        app = BlockingApp()
+        app.release.set()
+        middleware = AdmissionControlMiddleware(app)
+        assert await request(middleware, scope()) == 200
+        assert await request(middleware, scope()) == 429
+        assert await request(middleware, scope(client=("198.51.100.9", 5000))) == 200
+        # Owner routes are not rate limited
+        assert await request(middleware, scope(path="/api/leads/1", method="GET")) == 200
+
+    asyncio.run(scenario())
+    assert admission.counters["rate_limited_ip"] == 1
@@ -0,0 +1,137 @@
+import threading
+
+import pytest
+
+from app import circuit_breaker
+from app.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+from app.clients import _is_stripe_failure, _is_twilio_failure
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class UpstreamError(Exception):
+    def __init__(self, status=None):
+        super().__init__(f"upstream error {status}")
+        self.status = status
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", clock)
+    return clock
+
+
+def fail(status=None):
+    raise UpstreamError(status)
+
+
+def trip(breaker, times):
+    for _ in range(times):
+        with pytest.raises(UpstreamError):
+            breaker.call(fail)
+
+
+def test_opens_after_threshold(clock):
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=30)
+    trip(breaker, 2)
+    assert breaker.state == CLOSED
+    trip(breaker, 1)
+    assert breaker.state == OPEN
+
+
+def test_success_resets_failure_count(clock):
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=30)
+    trip(breaker, 2)
+    assert breaker.call(lambda: "ok") == "ok"
+    trip(breaker, 2)
+    assert breaker.state == CLOSED
+
+
+def test_fails_fast_while_open(clock):
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=30)
+    trip(breaker, 1)
+    calls = []
+    clock.now += 10
+    with pytest.raises(CircuitOpenError) as excinfo:
+        breaker.call(calls.append, "should not run")
+    assert calls == []
+    assert excinfo.value.retry_in == pytest.approx(20)
+
+
+def test_single_half_open_trial(clock):
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=30)
+    trip(breaker, 1)
+    clock.now += 30
+    assert breaker.state == HALF_OPEN
+
+    trial_started = threading.Event()
+    release_trial = threading.Event()
+
+    def slow_trial():
+        trial_started.set()
+        release_trial.wait(5)
+        return "recovered"
+
+    results = []
+    trial = threading.Thread(target=lambda: results.append(breaker.call(slow_trial)))
+    trial.start()
+    assert trial_started.wait(5)
+    # A second caller during the trial is rejected rather than piling onto the upstream
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: "second")
+    release_trial.set()
+    trial.join(5)
+
+    assert results == ["recovered"]
+    assert breaker.state == CLOSED
+
+
+def test_failed_trial_reopens(clock):
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=30)
+    trip(breaker, 3)
+    clock.now += 30
+    trip(breaker, 1)
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: "too soon")
+
+
+def test_client_errors_count_as_success(clock):
+    breaker = CircuitBreaker("twilio", failure_threshold=1, reset_timeout=30, is_failure=_is_twilio_failure)
+    for _ in range(3):
+        with pytest.raises(UpstreamError):
+            breaker.call(fail, 400)
+    assert breaker.state == CLOSED
+    with pytest.raises(UpstreamError):
+        breaker.call(fail, 503)
+    assert breaker.state == OPEN
+
+
+def test_client_error_closes_half_open_circuit(clock):
+    breaker = CircuitBreaker("twilio", failure_threshold=1, reset_timeout=30, is_failure=_is_twilio_failure)
+    trip(breaker, 1)
+    clock.now += 30
+    with pytest.raises(UpstreamError):
+        breaker.call(fail, 404)
+    assert breaker.state == CLOSED
+
+
+@pytest.mark.parametrize("attribute, classify", [("status", _is_twilio_failure), ("http_status", _is_stripe_failure)])
+def test_failure_classifiers(attribute, classify):
+    def error(status):
+        e = Exception()
+        setattr(e, attribute, status)
+        return e
+
+    assert not classify(error(400))
+    assert not classify(error(429))
+    assert classify(error(500))
+    assert classify(error(None))
+    assert classify(Exception("connection reset"))
@@ -0,0 +1,63 @@
+from app.lead_cache import LeadCache
+
+
+def connected_cache(max_size=2):
+    cache = LeadCache(max_size)
+    # Pretend the listener thread is up without starting it
+    cache._listener_started = True
+    cache.listener_connected = True
+    return cache
+
+
+def test_hit_after_put():
+    cache = connected_cache()
+    cache.put(1, cache.version(1), b"lead 1")
+    assert cache.get(1) == b"lead 1"
+    assert cache.stats["hit"] == 1
+
+
+def test_put_read_before_a_write_is_dropped():
+    cache = connected_cache()
+    version = cache.version(1)
+    cache.invalidate(1, remote=True)
+    cache.put(1, version, b"stale")
+    assert cache.get(1) is None
+    assert cache.stats["miss"] == 1
+
+
+def test_invalidate_drops_entry():
+    cache = connected_cache()
+    cache.put(1, cache.version(1), b"lead 1")
+    cache.invalidate(1)
+    assert cache.get(1) is None
+
+
+def test_least_recently_used_is_evicted():
+    cache = connected_cache(max_size=2)
+    for lead_id in (1, 2):
+        cache.put(lead_id, cache.version(lead_id), b"lead")
+    cache.get(1)
+    cache.put(3, cache.version(3), b"lead")
+    assert cache.get(2) is None
+    assert cache.get(1) == b"lead"
+    assert cache.stats["eviction"] == 1
+
+
+def test_evicted_versions_still_reject_stale_puts():
+    cache = connected_cache(max_size=1)
+    version = cache.version(1)
+    cache.invalidate(1)
+    # Push lead 1's version out of the bounded version map
+    for lead_id in range(2, 20):
+        cache.invalidate(lead_id)
+        cache.put(lead_id, cache.version(lead_id), b"lead")
+    cache.put(1, version, b"stale")
+    assert cache.get(1) is None
+
+
+def test_bypassed_while_listener_disconnected():
+    cache = connected_cache()
+    cache.put(1, cache.version(1), b"lead 1")
+    cache.listener_connected = False
+    assert cache.get(1) is None
+    assert cache.stats["bypass"] == 1
@@ -0,0 +1,97 @@
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+from app.pricing import AFTERMARKET, OEM, OEM_UPGRADE_ADDON, PriceIndex, compute_quote
+
+
+def entry(id, price, category="glass", item="Windshield", glassType=OEM, make=None, model=None, bodyType=None, yearMin=None, yearMax=None):
+    return SimpleNamespace(
+        id=id, price=price, category=category, item=item, glassType=glassType,
+        make=make, model=model, bodyType=bodyType, yearMin=yearMin, yearMax=yearMax,
+    )
+
+
+def lead(**overrides):
+    values = dict(
+        id=1, make="Honda", model="Accord", bodyType="Sedan", year="2018",
+        glassToReplace=["Windshield"], addonServices=[],
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def lookup(index, make="Honda", model="Accord", body_type="Sedan", year=2018, glass_type=OEM):
+    return index.lookup("glass", "Windshield", glass_type, make, model, body_type, year)
+
+
+def test_lookup_prefers_most_specific_entry():
+    index = PriceIndex([
+        entry(1, "300"),
+        entry(2, "350", make="Honda"),
+        entry(3, "400", make="Honda", model="Accord"),
+        entry(4, "450", make="Honda", model="Accord", yearMin=2018, yearMax=2022),
+    ])
+    assert lookup(index) == (Decimal("450"), 4)
+    assert lookup(index, year=2015) == (Decimal("400"), 3)
+    assert lookup(index, model="Civic") == (Decimal("350"), 2)
+    assert lookup(index, make="Toyota", model="Camry") == (Decimal("300"), 1)
+
+
+def test_lookup_ties_go_to_lowest_id():
+    index = PriceIndex([entry(7, "410", make="Honda"), entry(5, "390", make="Honda")])
+    assert lookup(index) == (Decimal("390"), 5)
+
+
+def test_lookup_is_case_insensitive():
+    index = PriceIndex([entry(1, "300", make="HONDA", glassType="oem")])
+    assert lookup(index, make="honda ") == (Decimal("300"), 1)
+
+
+@pytest.mark.parametrize("year, expected", [
+    (2017, None),
+    (2018, (Decimal("450"), 1)),
+    (2022, (Decimal("450"), 1)),
+    (2023, None),
+    (None, None),
+])
+def test_lookup_year_bounds_are_inclusive(year, expected):
+    index = PriceIndex([entry(1, "450", yearMin=2018, yearMax=2022)])
+    assert lookup(index, year=year) == expected
+
+
+def test_lookup_open_ended_year_bounds():
+    index = PriceIndex([entry(1, "450", yearMin=2018), entry(2, "300", yearMax=2010)])
+    assert lookup(index, year=2030) == (Decimal("450"), 1)
+    assert lookup(index, year=2005) == (Decimal("300"), 2)
+    assert lookup(index, year=2014) is None
+
+
+def test_compute_quote_lowercase_glass_type_is_in_summary():
+    index = PriceIndex([entry(1, "300.00"), entry(2, "50.00", category="addon", item="Rain Sensor", glassType=None)])
+    estimate = compute_quote(lead(addonServices=["Rain Sensor"]), index, glass_type="oem")
+
+    assert estimate.glass_type == OEM
+    assert estimate.total_amount == 350.0
+    assert estimate.services_summary == "## OEM Services\n• Windshield: $300.00\n## Add-ons\n• Rain Sensor: $50.00"
+
+
+def test_compute_quote_defaults_to_lead_preference_and_reports_unpriced():
+    index = PriceIndex([entry(1, "250.00", glassType=AFTERMARKET), entry(2, "300.00")])
+
+    aftermarket = compute_quote(lead(glassToReplace=["Windshield", "Back Glass"]), index, deposit_percentage=50)
+    assert aftermarket.glass_type == AFTERMARKET
+    assert aftermarket.total_amount == 250.0
+    assert aftermarket.deposit_amount == 125.0
+    assert aftermarket.unpriced_items == ["Back Glass"]
+
+    oem = compute_quote(lead(addonServices=[OEM_UPGRADE_ADDON]), index)
+    assert oem.glass_type == OEM
+    assert oem.total_amount == 300.0
+    assert oem.unpriced_items == []
+
+
+def test_compute_quote_rejects_unknown_glass_type():
+    with pytest.raises(ValueError):
+        compute_quote(lead(), PriceIndex([]), glass_type="Tinted")
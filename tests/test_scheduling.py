@@ -0,0 +1,99 @@
+from datetime import datetime, time, timedelta
+from types import SimpleNamespace
+
+from app.scheduling import BUSINESS_TIMEZONE, AvailabilityIndex, check_booking_slot, parse_preferred_days_times, suggest_slots
+
+# Monday
+DAY = datetime(2026, 10, 19).date()
+
+
+def at(hour, minute=0, day_offset=0):
+    return datetime.combine(DAY + timedelta(days=day_offset), time(hour, minute), tzinfo=BUSINESS_TIMEZONE)
+
+
+def technician(id, name="Alex"):
+    return SimpleNamespace(id=id, name=name)
+
+
+def window(technician_id, start, end, weekday=0):
+    return SimpleNamespace(technicianId=technician_id, weekday=weekday, startTime=start, endTime=end)
+
+
+def booking(technician_id, start, end):
+    return SimpleNamespace(technicianId=technician_id, startsAt=start, endsAt=end)
+
+
+def starts(slots):
+    return [(s.technician_id, s.start) for s in slots]
+
+
+def test_next_free_slots_skips_booked_ranges():
+    index = AvailabilityIndex(
+        [technician(1)],
+        [window(1, time(8), time(12))],
+        [booking(1, at(9), at(10, 30))],
+    )
+    slots = index.next_free_slots(at(6), count=10, days=1)
+    # 8:00 and 8:30 would run into the 9:00 booking; 11:00 would end after the window
+    assert starts(slots) == [(1, at(10, 30))]
+    assert slots[0].end == at(12)
+
+
+def test_next_free_slots_offers_each_start_once_with_first_free_technician():
+    index = AvailabilityIndex(
+        [technician(1), technician(2, "Sam")],
+        [window(1, time(8), time(10)), window(2, time(8), time(10))],
+        [booking(1, at(8), at(9, 30))],
+    )
+    assert starts(index.next_free_slots(at(6), count=10, days=1)) == [(2, at(8)), (2, at(8, 30))]
+
+
+def test_next_free_slots_respects_minimum_notice():
+    index = AvailabilityIndex([technician(1)], [window(1, time(8), time(12))], [])
+    # 60 minutes notice from 8:10 is 9:10, rounded up onto the 30 minute grid
+    assert starts(index.next_free_slots(at(8, 10), count=1, days=1)) == [(1, at(9, 30))]
+
+
+def test_next_free_slots_within_preferred_period():
+    index = AvailabilityIndex([technician(1)], [window(1, time(8), time(17))], [])
+    slots = suggest_slots(index, at(6), ["Monday Afternoon"], count=3, days=7)
+    assert starts(slots) == [(1, at(12)), (1, at(12, 30)), (1, at(13))]
+
+
+def test_preferred_period_may_start_late_in_window_but_must_end_inside_it():
+    index = AvailabilityIndex([technician(1)], [window(1, time(8), time(13))], [])
+    afternoon = parse_preferred_days_times(["Monday Afternoon"])
+    assert index.next_free_slots(at(6), count=10, days=1, preferences=afternoon) == []
+    morning = parse_preferred_days_times(["Monday Morning"])
+    assert starts(index.next_free_slots(at(6), count=10, days=1, preferences=morning))[-1] == (1, at(11, 30))
+
+
+def test_preferred_period_stays_on_window_grid():
+    index = AvailabilityIndex([technician(1)], [window(1, time(8, 15), time(17))], [])
+    slots = suggest_slots(index, at(6), ["Monday Afternoon"], count=1, days=1)
+    assert starts(slots) == [(1, at(12, 15))]
+
+
+def test_suggest_slots_falls_back_to_earliest_openings():
+    index = AvailabilityIndex([technician(1)], [window(1, time(8), time(12))], [])
+    # No Tuesday windows at all
+    slots = suggest_slots(index, at(6), ["Tuesday Morning"], count=2, days=7)
+    assert starts(slots) == [(1, at(8)), (1, at(8, 30))]
+
+
+def test_suggest_slots_without_preferences():
+    index = AvailabilityIndex([technician(1)], [window(1, time(8), time(12), weekday=1)], [])
+    assert starts(suggest_slots(index, at(6), None, count=1, days=7)) == [(1, at(8, day_offset=1))]
+
+
+def test_check_booking_slot():
+    windows = [window(1, time(8), time(12))]
+    now = at(0)
+    assert check_booking_slot(windows, at(8), now) is None
+    assert check_booking_slot(windows, at(10, 30), now) is None
+    assert "working hours" in check_booking_slot(windows, at(3), now)
+    assert "working hours" in check_booking_slot(windows, at(11), now)
+    assert "working hours" in check_booking_slot(windows, at(8, day_offset=1), now)
+    assert "grid" in check_booking_slot(windows, at(8, 10), now)
+    assert "notice" in check_booking_slot(windows, at(8), at(7, 30))
+    assert "notice" in check_booking_slot(windows, at(8, day_offset=-7), now)
@@ -0,0 +1,130 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.vin import apply_vin_to_lead_data, compute_check_digit, decode_model_year, decode_vin, get_vin_index
+
+HONDA_ACCORD_2003 = "1HGCM82633A004352"
+
+
+def with_check_digit(vin: str) -> str:
+    """Replaces position 9 of a 17-character VIN with its correct check digit."""
+    return vin[:8] + compute_check_digit(vin) + vin[9:]
+
+
+def lead_data(vin, make="", model="", year=""):
+    return SimpleNamespace(vin=vin, make=make, model=model, year=year)
+
+
+def test_decodes_known_vin():
+    result = decode_vin(HONDA_ACCORD_2003)
+    assert result.valid
+    assert result.check_digit_valid
+    assert result.errors == []
+    assert result.wmi == "1HG"
+    assert result.region == "United States"
+    assert (result.make, result.model, result.year) == ("Honda", "Accord", "2003")
+
+
+def test_normalizes_case_spaces_and_dashes():
+    result = decode_vin(" 1hgcm826-33a004352 ")
+    assert result.vin == HONDA_ACCORD_2003
+    assert result.check_digit_valid
+
+
+def test_check_digit():
+    assert compute_check_digit(HONDA_ACCORD_2003) == "3"
+    # Remainder 10 is written as X
+    assert compute_check_digit("1M8GDM9AXKP042788") == "X"
+
+
+def test_bad_check_digit_is_reported_but_still_decoded():
+    result = decode_vin(HONDA_ACCORD_2003[:8] + "4" + HONDA_ACCORD_2003[9:])
+    assert result.valid
+    assert not result.check_digit_valid
+    assert result.errors == ["Check digit does not match."]
+    assert result.make == "Honda"
+
+
+@pytest.mark.parametrize("bad_char", ["I", "O", "Q"])
+def test_rejects_i_o_q(bad_char):
+    result = decode_vin(HONDA_ACCORD_2003[:12] + bad_char + HONDA_ACCORD_2003[13:])
+    assert not result.valid
+    assert result.errors == [f"VIN contains invalid characters: {bad_char}."]
+
+
+def test_rejects_wrong_length():
+    result = decode_vin(HONDA_ACCORD_2003[:-1])
+    assert not result.valid
+    assert result.errors == ["VIN must be 17 characters, got 16."]
+
+
+@pytest.mark.parametrize("vin, year", [
+    # Position 7 is a digit: first 30-year cycle
+    ("1HGCM82633A004352", 2003),
+    ("1HGCM826X1A000000", 2001),
+    # Position 7 is a letter: 2010 onwards
+    ("1HGCP2F30AA000000", 2010),
+    ("2HGFC2F50KH000000", 2019),
+])
+def test_model_year_position_7_rule(vin, year):
+    assert decode_model_year(vin) == year
+
+
+def test_model_year_unknown_code():
+    assert decode_model_year("1HGCM8263UA004352") is None
+
+
+def test_vds_make_override_and_longest_pattern():
+    charger = decode_vin(with_check_digit("2C3CDXBG0KH000000"))
+    assert (charger.make, charger.model) == ("Dodge", "Charger")
+    chrysler = decode_vin(with_check_digit("2C3CCAAG0KH000000"))
+    assert chrysler.model == "300"
+    assert chrysler.make == get_vin_index().wmi["2C3"]
+
+
+def test_unknown_wmi_still_valid():
+    result = decode_vin(with_check_digit("ZZZ11111011111111"))
+    assert result.valid
+    assert result.make is None and result.model is None
+
+
+def test_apply_valid_vin_overrides_typed_values():
+    data = lead_data(HONDA_ACCORD_2003.lower(), make="Toyota", model="Camry", year="2015")
+    apply_vin_to_lead_data(data)
+    assert (data.vin, data.make, data.model, data.year) == (HONDA_ACCORD_2003, "Honda", "Accord", "2003")
+
+
+def test_apply_bad_check_digit_only_fills_blanks():
+    vin = HONDA_ACCORD_2003[:8] + "4" + HONDA_ACCORD_2003[9:]
+    data = lead_data(vin, make="Acura", model="Other", year="")
+    apply_vin_to_lead_data(data)
+    assert (data.make, data.model, data.year) == ("Acura", "Accord", "2003")
+
+
+def test_apply_ignores_missing_or_invalid_vin():
+    data = lead_data(None, make="Toyota")
+    apply_vin_to_lead_data(data)
+    assert data.make == "Toyota"
+
+    data = lead_data("NOT-A-VIN", make="Toyota")
+    apply_vin_to_lead_data(data)
+    assert (data.vin, data.make) == ("NOT-A-VIN", "Toyota")
+
+
+def test_apply_valid_vin_with_other_make_replaces_vehicle_as_a_unit():
+    # Known Ford WMI, descriptor that matches no VDS pattern
+    vin = with_check_digit("1FAZZZZZ0KA000000")
+    decoded = decode_vin(vin)
+    assert decoded.check_digit_valid and decoded.make == "Ford" and decoded.model is None
+
+    data = lead_data(vin, make="Toyota", model="Camry", year="2015")
+    apply_vin_to_lead_data(data)
+    assert (data.make, data.model, data.year) == ("Ford", "", decoded.year)
+
+
+def test_apply_valid_vin_same_make_keeps_typed_model_when_not_decoded():
+    vin = with_check_digit("1FAZZZZZ0KA000000")
+    data = lead_data(vin, make="ford", model="Focus", year="2019")
+    apply_vin_to_lead_data(data)
+    assert data.model == "Focus"